@@ -0,0 +1,91 @@
+"""
+get_available_appointment_slots over a year-long range, three ways: the
+original implementation (step hour by hour, scan every appointment for each
+slot), the same hourly walk over a set built from the store's range index,
+and the SlotAvailability engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_availability
+"""
+import time
+from datetime import date, datetime, timedelta
+from common.availability import SlotAvailability
+from common.config import BUSINESS_HOURS
+from common.data_store import MockDataStore
+from common.mock_data_bulk import generate_columns, to_mock_data
+
+BASE_DATE = date(2026, 1, 5)
+CUSTOMERS = [1000, 10_000, 100_000]
+QUERIES = 20
+# The original scan is O(hours x appointments); time a single query of it
+ORIGINAL_QUERIES = 1
+
+
+def original_scan(appointments, start, end):
+    """The original implementation: for every business hour, any() over all appointments."""
+    slots = []
+    current = start
+    while current <= end:
+        if current.hour >= 9 and current.hour < 17:
+            slot_time = current.isoformat()
+            taken = any(a["date"] == slot_time for a in appointments)
+            if not taken:
+                slots.append(slot_time)
+        current += timedelta(hours=1)
+    return slots
+
+
+def hourly_scan(store, start, end):
+    """Hourly walk against a taken set from the store's appointments_between range index."""
+    taken = {a["date"] for a in store.appointments_between(start, end)}
+    slots = []
+    current = start
+    while current <= end:
+        if current.hour >= 9 and current.hour < 17:
+            slot_time = current.isoformat()
+            if slot_time not in taken:
+                slots.append(slot_time)
+        current += timedelta(hours=1)
+    return slots
+
+
+def timed(fn, *args, queries=QUERIES):
+    start = time.perf_counter()
+    for _ in range(queries):
+        result = fn(*args)
+    return (time.perf_counter() - start) / queries * 1e3, result
+
+
+def bench(customers):
+    data = to_mock_data(
+        generate_columns(customers, seed=0, base_date=BASE_DATE, day_spread=365)
+    )
+    store = MockDataStore(data)
+
+    start = time.perf_counter()
+    availability = SlotAvailability.from_dates(store.appointment_dates(), BUSINESS_HOURS)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    range_start = datetime.combine(BASE_DATE, datetime.min.time())
+    range_end = range_start + timedelta(days=365)
+    original_ms, original_slots = timed(
+        original_scan, data["appointments"], range_start, range_end, queries=ORIGINAL_QUERIES
+    )
+    scan_ms, scan_slots = timed(hourly_scan, store, range_start, range_end)
+    engine_ms, engine_slots = timed(availability.available_slots, range_start, range_end)
+    assert [slot.isoformat() for slot in engine_slots] == scan_slots == original_slots
+
+    print(
+        f"{len(data['appointments']):>8} appointments  original {original_ms:10.1f} ms  "
+        f"indexed hourly scan {scan_ms:8.2f} ms  engine {engine_ms:8.2f} ms  "
+        f"(engine build {build_ms:.1f} ms, {len(engine_slots)} free slots)"
+    )
+
+
+if __name__ == "__main__":
+    print(
+        f"Available slots over one year, default business hours, mean of {QUERIES} queries "
+        f"({ORIGINAL_QUERIES} for the original scan)"
+    )
+    for customers in CUSTOMERS:
+        bench(customers)
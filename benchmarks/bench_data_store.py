@@ -0,0 +1,91 @@
+"""
+Lookup cost of the in-memory MockDataStore vs SQLiteDataStore at several data sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_data_store [sizes...]
+
+Sizes are customer counts (default 1000 100000 1000000); appointments and
+orders scale with the same ratios as MOCK_DATA_SIZE. Data comes from the
+seeded bulk generator in common/mock_data_bulk.py.
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from common.data_store import MockDataStore
+from common.mock_data_bulk import generate_columns, to_mock_data
+from common.sqlite_store import SQLiteDataStore
+
+LOOKUPS = 2000
+DEFAULT_SIZES = [1000, 100_000, 1_000_000]
+BASE_DATE = date(2026, 1, 5)
+# Spread appointments over a year so a one-day range query stays selective at 1M customers
+DAY_SPREAD = 365
+
+
+async def time_lookups(store, customers):
+    rng = random.Random(1)
+    start_day = datetime.combine(BASE_DATE, datetime.min.time())
+
+    def day_range(day):
+        return store.call(store.appointments_between, day, day + timedelta(hours=23))
+
+    queries = {
+        "get_customer(phone)": lambda: store.call(
+            store.get_customer, phone=f"+1555{rng.randrange(customers):07d}"
+        ),
+        "get_customer_appointments": lambda: store.call(
+            store.get_customer_appointments, f"CUST{rng.randrange(customers):04d}"
+        ),
+        "get_customer_orders": lambda: store.call(
+            store.get_customer_orders, f"CUST{rng.randrange(customers):04d}"
+        ),
+        "appointments_between(1 day)": lambda: day_range(
+            start_day + timedelta(days=rng.randrange(365))
+        ),
+    }
+    results = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(LOOKUPS):
+            await query()
+        results[name] = (time.perf_counter() - start) / LOOKUPS * 1e6
+    return results
+
+
+def bench(customers):
+    data = to_mock_data(
+        generate_columns(customers, seed=0, base_date=BASE_DATE, day_spread=DAY_SPREAD)
+    )
+    print(
+        f"\n{customers} customers, {len(data['appointments'])} appointments, "
+        f"{len(data['orders'])} orders"
+    )
+
+    start = time.perf_counter()
+    memory_store = MockDataStore(data)
+    memory_build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = SQLiteDataStore(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        sqlite_store.load(data)
+        sqlite_build = time.perf_counter() - start
+
+        memory = asyncio.run(time_lookups(memory_store, customers))
+        sqlite = asyncio.run(time_lookups(sqlite_store, customers))
+        sqlite_store.close()
+
+    print(f"  {'build/load':<30} {memory_build * 1e3:10.1f} ms {sqlite_build * 1e3:10.1f} ms")
+    for name in memory:
+        print(f"  {name:<30} {memory[name]:10.1f} us {sqlite[name]:10.1f} us")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'':<32} {'in-memory':>13} {'sqlite':>13}")
+    for size in sizes:
+        bench(size)
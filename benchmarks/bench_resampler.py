@@ -0,0 +1,52 @@
+"""
+Cost of StreamingResampler per 20ms input frame.
+
+Run from the repository root:
+    python -m benchmarks.bench_resampler
+"""
+import time
+import numpy as np
+from common.resampler import StreamingResampler
+
+FRAME_SECS = 0.02
+SECONDS_OF_AUDIO = 10
+CONVERSIONS = [
+    (44100, 16000),
+    (48000, 16000),
+    (44100, 48000),
+    (48000, 48000),
+]
+
+
+def bench(in_rate, out_rate):
+    frame_samples = int(in_rate * FRAME_SECS)
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(-8000, 8000, frame_samples, dtype=np.int16).tobytes()
+        for _ in range(int(SECONDS_OF_AUDIO / FRAME_SECS))
+    ]
+    resampler = StreamingResampler(in_rate, out_rate)
+    # Warm up numpy code paths
+    for frame in frames[:10]:
+        resampler.process(frame)
+    resampler.reset()
+
+    start = time.perf_counter()
+    out_bytes = 0
+    for frame in frames:
+        out_bytes += len(resampler.process(frame))
+    elapsed = time.perf_counter() - start
+
+    per_frame_us = elapsed / len(frames) * 1e6
+    realtime_factor = SECONDS_OF_AUDIO / elapsed
+    print(
+        f"{in_rate:>6} -> {out_rate:<6} {per_frame_us:8.1f} us/frame  "
+        f"{realtime_factor:8.0f}x realtime  "
+        f"bytes in/out per frame: {frame_samples * 2}/{out_bytes // len(frames)}"
+    )
+
+
+if __name__ == "__main__":
+    print(f"StreamingResampler, {FRAME_SECS * 1000:.0f}ms frames, {SECONDS_OF_AUDIO}s of audio")
+    for in_rate, out_rate in CONVERSIONS:
+        bench(in_rate, out_rate)
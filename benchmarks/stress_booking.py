@@ -0,0 +1,128 @@
+"""
+Stress test for concurrent appointment booking.
+
+Hundreds of coroutines, spread over several event loops (threads) like voice
+agent sessions are, race to book a handful of slots through
+schedule_appointment. Afterwards every appointment ID must be unique and no
+slot may be booked twice. A second phase bypasses the availability index and
+races store.add_appointment() directly from threads, as separate processes
+sharing a database would, to check the store's own slot guard.
+
+Run from the repository root:
+    python -m benchmarks.stress_booking [--sqlite]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from common.config import ARTIFICIAL_DELAY, DATABASE_CONFIG, MOCK_DATA_SETTINGS
+
+LOOPS = 4
+COROUTINES_PER_LOOP = 100
+# Two days of business hours; far fewer slots than bookers, so most must be refused
+FIRST_DAY = datetime(2030, 1, 7)
+SLOTS = [
+    FIRST_DAY + timedelta(days=day, hours=hour) for day in range(2) for hour in range(9, 17)
+]
+STORE_RACE_THREADS = 32
+
+
+async def book(business_logic, rng):
+    # Jitter which await the coroutines interleave at
+    await asyncio.sleep(rng.random() * 0.01)
+    slot = rng.choice(SLOTS)
+    return await business_logic.schedule_appointment(
+        f"CUST{rng.randrange(100):04d}", slot.isoformat(), "Consultation"
+    )
+
+
+async def run_loop(business_logic, seed):
+    rng = random.Random(seed)
+    return await asyncio.gather(
+        *(book(business_logic, rng) for _ in range(COROUTINES_PER_LOOP))
+    )
+
+
+def race_store(store):
+    """Many threads insert into the same fresh slot; exactly one must win."""
+    slot = (FIRST_DAY + timedelta(days=30, hours=10)).isoformat()
+
+    def insert(_):
+        return store.add_appointment(
+            {
+                "id": store.allocate_appointment_id(),
+                "customer_id": "CUST0001",
+                "customer_name": "Customer 1",
+                "date": slot,
+                "service": "Consultation",
+                "status": "Scheduled",
+            }
+        )
+
+    with ThreadPoolExecutor(STORE_RACE_THREADS) as pool:
+        results = list(pool.map(insert, range(STORE_RACE_THREADS)))
+    return sum(result is not None for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sqlite", action="store_true", help="use the SQLite data store")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.sqlite:
+        DATABASE_CONFIG.update(enable=True, path=os.path.join(tmp.name, "stress.db"))
+    MOCK_DATA_SETTINGS["save_output"] = False
+    ARTIFICIAL_DELAY["database"] = 0.001
+
+    from common import business_logic
+
+    store = business_logic.get_store()
+    before = store.appointment_count()
+
+    start = time.perf_counter()
+    # One event loop per thread, like EventLoopPool
+    with ThreadPoolExecutor(LOOPS) as pool:
+        per_loop = list(
+            pool.map(lambda seed: asyncio.run(run_loop(business_logic, seed)), range(LOOPS))
+        )
+    elapsed = time.perf_counter() - start
+    results = [result for loop_results in per_loop for result in loop_results]
+
+    booked = [result for result in results if "error" not in result]
+    refused = [result for result in results if result.get("error") == "Slot not available"]
+    ids = Counter(result["id"] for result in booked)
+    slots = Counter(result["date"] for result in booked)
+    duplicate_ids = [key for key, count in ids.items() if count > 1]
+    double_booked = [key for key, count in slots.items() if count > 1]
+
+    print(
+        f"{'sqlite' if args.sqlite else 'in-memory'} store: {len(results)} bookings over "
+        f"{LOOPS} loops in {elapsed:.2f}s -> {len(booked)} booked, {len(refused)} refused, "
+        f"{len(results) - len(booked) - len(refused)} other errors"
+    )
+    print(f"  duplicate IDs: {len(duplicate_ids)}  double-booked slots: {len(double_booked)}")
+    print(f"  appointments added to store: {store.appointment_count() - before}")
+
+    winners = race_store(store)
+    print(f"  direct store race: {winners} of {STORE_RACE_THREADS} inserts into one slot succeeded")
+
+    ok = (
+        not duplicate_ids
+        and not double_booked
+        and store.appointment_count() - before == len(booked) + winners
+        and winners == 1
+    )
+    print("OK" if ok else "FAILED")
+    tmp.cleanup()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 from flask_socketio import SocketIO
 import pyaudio
 import asyncio
@@ -6,18 +6,46 @@ import websockets
 import os
 import json
 import threading
+import contextvars
 import janus
 import queue
 import sys
 import re
 import time
 import requests
+import copy
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from common.agent_functions import FUNCTION_MAP
-from common.agent_templates import AgentTemplates, AGENT_AUDIO_SAMPLE_RATE
+from common.function_cache import FUNCTION_CACHE
+from common.audio_assets import AUDIO_ASSETS
+from common.agent_templates import (
+    AgentTemplates,
+    AGENT_AUDIO_SAMPLE_RATE,
+    AGENT_AUDIO_PACKET_SECS,
+)
 import logging
-from common.business_logic import MOCK_DATA
-from common.log_formatter import CustomFormatter
+from common.business_logic import get_mock_data
+from common.log_formatter import CustomFormatter, SESSION_SID, session_logger
+from common.sessions import SessionRegistry
+from common.loop_pool import EventLoopPool
+from common.audio_queue import MicAudioQueue
+from common.resampler import StreamingResampler
+from common.jitter_buffer import JitterBuffer
+from common.config import JITTER_BUFFER, FUNCTION_CALLS, AUDIO_STREAM, AUDIO_ASSET_CACHE
+from common.metrics import (
+    METRICS,
+    TurnTimings,
+    BARGE_IN_LATENCY,
+    FUNCTION_LATENCY,
+)
+from common.audio_transport import (
+    AudioPacketizer,
+    AUDIO_PACKET_FLAG_END,
+    audio_format_message,
+    pack_audio_packet,
+)
+from common.tts_cache import TTS_CACHE
 
 
 # Configure Flask and SocketIO
@@ -36,6 +64,38 @@ logger.addHandler(console_handler)
 # Remove any existing handlers from the root logger to avoid duplicate messages
 logging.getLogger().handlers = []
 
+# Active voice agent sessions, one per Socket.IO client
+sessions = SessionRegistry()
+
+# Shared event loops that host every session's VoiceAgent.run() coroutine
+loop_pool = EventLoopPool()
+
+# Threads for FUNCTION_MAP entries that are plain (blocking) functions
+function_executor = ThreadPoolExecutor(
+    max_workers=FUNCTION_CALLS["thread_pool_size"], thread_name_prefix="function"
+)
+
+METRICS.gauge(
+    "voice_agent_sessions_active",
+    "Voice agent sessions currently running in this process",
+    lambda: len(sessions),
+)
+METRICS.gauge(
+    "voice_agent_sessions_max",
+    "Session limit for this process",
+    lambda: sessions.max_sessions,
+)
+METRICS.gauge(
+    "voice_agent_function_calls_in_flight",
+    "Function calls running or waiting for a slot across active sessions",
+    lambda: sum(len(agent.function_tasks) for agent in sessions.values()),
+)
+METRICS.gauge(
+    "voice_agent_mic_queue_depth",
+    "Microphone frames queued for Deepgram across active sessions",
+    lambda: sum(agent.audio_stats().get("depth", 0) for agent in sessions.values()),
+)
+
 
 class VoiceAgent:
     def __init__(
@@ -44,22 +104,34 @@ class VoiceAgent:
         voiceModel="aura-2-thalia-en",
         voiceName="",
         browser_audio=False,
+        sid=None,
     ):
+        self.sid = sid  # Socket.IO session id; all emits are scoped to this client
         self.mic_audio_queue = None
         self.speaker = None
         self.ws = None
         self.is_running = False
         self.loop = None
+        self.task = None  # concurrent.futures.Future for run() on the shared loop
+        self.playback_done = None  # set when the browser acknowledges audio_playback_done
+        self.turn = None  # TurnTimings for the turn in progress
+        self.injected_messages = set()  # InjectAgentMessage texts not yet spoken (e.g. filler)
+        self.speaking_injected = False  # the agent is speaking one of those, not an answer
+        self.function_tasks = set()  # function calls in flight, each sends its own response
+        self.function_slots = None  # asyncio.Semaphore capping concurrent function calls
+        self.last_function_response_time = None
+        self.pending_greeting = None  # greeting played from pre-rendered audio on Welcome
         self.audio = None
         self.stream = None
         self.input_device_id = None
         self.output_device_id = None
         self.browser_audio = browser_audio  # For browser microphone input
         self.browser_output = browser_audio  # Use same setting for browser output
-        self.agent_templates = AgentTemplates(persona, voiceModel, voiceName)
-
-    def set_loop(self, loop):
-        self.loop = loop
+        self.first_audio_logged = False
+        self.resampler = None  # per-session filter state for browser audio
+        self.agent_templates = AgentTemplates(
+            persona, voiceModel, voiceName, browser_audio=browser_audio
+        )
 
     async def setup(self):
         dg_api_key = os.environ.get("DEEPGRAM_API_KEY")
@@ -68,6 +140,18 @@ class VoiceAgent:
             return False
 
         settings = self.agent_templates.settings
+        greeting = settings["agent"]["greeting"]
+        # The cache may read its index and audio from disk, so look up off the shared loop
+        if greeting and await asyncio.to_thread(
+            TTS_CACHE.contains, greeting, self.agent_templates.voiceModel
+        ):
+            # Play the greeting from pre-rendered audio instead of having the agent synthesize it
+            settings = copy.deepcopy(settings)
+            settings["agent"]["greeting"] = ""
+            settings["agent"]["think"]["prompt"] += (
+                f"\n\nYou have already greeted the user with: {greeting}"
+            )
+            self.pending_greeting = greeting
 
         try:
             self.ws = await websockets.connect(
@@ -76,7 +160,7 @@ class VoiceAgent:
             )
             await self.ws.send(json.dumps(settings))
             if self.mic_audio_queue is None:
-                self.mic_audio_queue = asyncio.Queue()
+                self.mic_audio_queue = MicAudioQueue(self.agent_templates.user_audio_sample_rate)
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Deepgram: {e}")
@@ -90,10 +174,10 @@ class VoiceAgent:
             and self.mic_audio_queue is not None
         ):
             try:
-                future = asyncio.run_coroutine_threadsafe(
-                    self.mic_audio_queue.put(input_data), self.loop
+                # Runs on the PortAudio thread: hand the frame off without waiting on the loop
+                self.loop.call_soon_threadsafe(
+                    self.mic_audio_queue.put_latest, input_data
                 )
-                future.result(timeout=1)  # Add timeout to prevent blocking
             except Exception as e:
                 logger.error(f"Error in audio callback: {e}")
         return (input_data, pyaudio.paContinue)
@@ -182,7 +266,9 @@ class VoiceAgent:
                 if not self.mic_audio_queue:
                     await asyncio.sleep(0.01)
                     continue
-                data = await self.mic_audio_queue.get()
+                # Merge whatever is queued into one message; ws.send awaits when
+                # Deepgram is slow, so the bounded queue absorbs the backpressure
+                data = await self.mic_audio_queue.get_coalesced()
                 if self.ws and data:
                     # Log the first audio chunk we send
                     if first_chunk:
@@ -193,6 +279,7 @@ class VoiceAgent:
 
                     # Send the audio data to Deepgram
                     await self.ws.send(data)
+                    self.mic_audio_queue.record_sent(len(data))
 
         except Exception as e:
             logger.error(f"Error in sender: {e}")
@@ -203,12 +290,16 @@ class VoiceAgent:
 
     async def receiver(self):
         try:
-            self.speaker = Speaker(browser_output=self.browser_output)
+            self.speaker = Speaker(
+                browser_output=self.browser_output,
+                sid=self.sid,
+                jitter_buffer=self.browser_output and JITTER_BUFFER["enabled"],
+            )
             last_user_message = None
-            last_function_response_time = None
+            self.last_function_response_time = None
             in_function_chain = False
 
-            with self.speaker:
+            async with self.speaker:
                 async for message in self.ws:
                     if isinstance(message, str):
                         logger.info(f"Server: {message}")
@@ -218,19 +309,36 @@ class VoiceAgent:
 
                         if message_type == "UserStartedSpeaking":
                             self.speaker.stop()
+                            # A turn whose answer never finished ends when the user speaks again
+                            self.finish_turn(audio_done=False)
+                            self.start_turn()
+                        elif message_type == "EndOfThought" and self.turn:
+                            self.turn.mark("user_speech_end")
                         elif message_type == "ConversationText":
                             # Emit the conversation text to the client
-                            socketio.emit("conversation_update", message_json)
+                            socketio.emit(
+                                "conversation_update", message_json, to=self.sid
+                            )
 
                             if message_json.get("role") == "user":
                                 last_user_message = current_time
                                 in_function_chain = False
+                                # user_speech_end comes only from EndOfThought; without
+                                # it the turn's latencies are not recorded rather than
+                                # measured from the transcript itself
+                                if self.turn:
+                                    self.turn.mark("first_transcript")
                             elif message_json.get("role") == "assistant":
                                 in_function_chain = False
+                                content = message_json.get("content")
+                                self.speaking_injected = content in self.injected_messages
+                                self.injected_messages.discard(content)
 
                         elif message_type == "FunctionCalling":
-                            if in_function_chain and last_function_response_time:
-                                latency = current_time - last_function_response_time
+                            if self.turn:
+                                self.turn.mark("function_calling")
+                            if in_function_chain and self.last_function_response_time:
+                                latency = current_time - self.last_function_response_time
                                 logger.info(
                                     f"LLM Decision Latency (chain): {latency:.3f}s"
                                 )
@@ -243,138 +351,261 @@ class VoiceAgent:
 
                         elif message_type == "FunctionCallRequest":
                             functions = message_json.get("functions", [])
-                            if len(functions) > 1:
-                                raise NotImplementedError(
-                                    "Multiple functions not supported"
-                                )
-                            function_name = functions[0].get("name")
-                            function_call_id = functions[0].get("id")
-                            parameters = json.loads(functions[0].get("arguments", {}))
-
-                            logger.info(f"Function call received: {function_name}")
-                            logger.info(f"Parameters: {parameters}")
-
-                            start_time = time.time()
-                            try:
-                                func = FUNCTION_MAP.get(function_name)
-                                if not func:
-                                    raise ValueError(
-                                        f"Function {function_name} not found"
-                                    )
-
-                                # Special handling for functions that need websocket
-                                if function_name in ["agent_filler", "end_call"]:
-                                    result = await func(self.ws, parameters)
-
-                                    if function_name == "agent_filler":
-                                        # Extract messages
-                                        inject_message = result["inject_message"]
-                                        function_response = result["function_response"]
-
-                                        # First send the function response
-                                        response = {
-                                            "type": "FunctionCallResponse",
-                                            "id": function_call_id,
-                                            "name": function_name,
-                                            "content": json.dumps(function_response),
-                                        }
-                                        await self.ws.send(json.dumps(response))
-                                        logger.info(
-                                            f"Function response sent: {json.dumps(function_response)}"
-                                        )
-
-                                        # Update the last function response time
-                                        last_function_response_time = time.time()
-                                        # Then just inject the message and continue
-                                        await inject_agent_message(
-                                            self.ws, inject_message
-                                        )
-                                        continue
-
-                                    elif function_name == "end_call":
-                                        # Extract messages
-                                        inject_message = result["inject_message"]
-                                        function_response = result["function_response"]
-                                        close_message = result["close_message"]
-
-                                        # First send the function response
-                                        response = {
-                                            "type": "FunctionCallResponse",
-                                            "id": function_call_id,
-                                            "name": function_name,
-                                            "content": json.dumps(function_response),
-                                        }
-                                        await self.ws.send(json.dumps(response))
-                                        logger.info(
-                                            f"Function response sent: {json.dumps(function_response)}"
-                                        )
-
-                                        # Update the last function response time
-                                        last_function_response_time = time.time()
-
-                                        # Then wait for farewell sequence to complete
-                                        await wait_for_farewell_completion(
-                                            self.ws, self.speaker, inject_message
-                                        )
-
-                                        # Finally send the close message and exit
-                                        logger.info(f"Sending ws close message")
-                                        await close_websocket_with_timeout(self.ws)
-                                        self.is_running = False
-                                        break
-                                else:
-                                    result = await func(parameters)
-
-                                execution_time = time.time() - start_time
-                                logger.info(
-                                    f"Function Execution Latency: {execution_time:.3f}s"
-                                )
-
-                                # Send the response back
-                                response = {
-                                    "type": "FunctionCallResponse",
-                                    "id": function_call_id,
-                                    "name": function_name,
-                                    "content": json.dumps(result),
-                                }
-                                await self.ws.send(json.dumps(response))
-                                logger.info(
-                                    f"Function response sent: {json.dumps(result)}"
-                                )
-
-                                # Update the last function response time
-                                last_function_response_time = time.time()
-
-                            except Exception as e:
-                                logger.error(f"Error executing function: {str(e)}")
-                                result = {"error": str(e)}
-                                response = {
-                                    "type": "FunctionCallResponse",
-                                    "id": function_call_id,
-                                    "name": function_name,
-                                    "content": json.dumps(result),
-                                }
-                                await self.ws.send(json.dumps(response))
-
+                            if self.turn:
+                                self.turn.mark("function_calling")
+                                self.turn.mark("function_start")
+
+                            # end_call closes the session, so it runs after the others
+                            end_call = next(
+                                (f for f in functions if f.get("name") == "end_call"),
+                                None,
+                            )
+                            # Every other function runs as a tracked task that sends its own
+                            # response, so this loop keeps draining audio meanwhile
+                            calls = [
+                                self.spawn_function_call(function)
+                                for function in functions
+                                if function is not end_call
+                            ]
+                            if end_call:
+                                # end_call reads the websocket itself, so it runs inline
+                                # once the rest of this request has been answered
+                                await asyncio.gather(*calls, return_exceptions=True)
+                                if await self.end_call(end_call):
+                                    self.is_running = False
+                                    break
+
+                        elif message_type == "AgentAudioDone":
+                            # Filler spoken while function calls run is not the turn's answer
+                            if self.speaking_injected or self.function_tasks:
+                                self.speaking_injected = False
+                            else:
+                                self.finish_turn()
                         elif message_type == "Welcome":
                             logger.info(
                                 f"Connected with session ID: {message_json.get('session_id')}"
                             )
+                            if self.pending_greeting:
+                                greeting, self.pending_greeting = self.pending_greeting, None
+                                await self.play_prerendered(greeting)
                         elif message_type == "CloseConnection":
                             logger.info("Closing connection...")
                             await self.ws.close()
                             break
 
                     elif isinstance(message, bytes):
+                        if self.turn:
+                            self.turn.mark("first_tts_byte")
                         await self.speaker.play(message)
 
         except Exception as e:
             logger.error(f"Error in receiver: {e}")
 
+    async def send_function_response(self, function_call_id, function_name, content):
+        """Send a FunctionCallResponse; content is the already serialized result."""
+        response = {
+            "type": "FunctionCallResponse",
+            "id": function_call_id,
+            "name": function_name,
+            "content": content,
+        }
+        await self.ws.send(json.dumps(response))
+        logger.info(f"Function response sent: {content}")
+
+    async def _execute_function(self, function_name, parameters):
+        func = FUNCTION_MAP.get(function_name)
+        if not func:
+            raise ValueError(f"Function {function_name} not found")
+        # Special handling for functions that need websocket
+        if function_name in ["agent_filler", "end_call"]:
+            return await func(self.ws, parameters)
+        # Plain (blocking or CPU-bound) functions run on the shared thread pool
+        if not asyncio.iscoroutinefunction(func):
+            return await asyncio.get_running_loop().run_in_executor(
+                function_executor, func, parameters
+            )
+        return await func(parameters)
+
+    def spawn_function_call(self, function):
+        """Run a function call as a task tracked by the session; returns the task."""
+        task = asyncio.create_task(self.run_function_call(function))
+        self.function_tasks.add(task)
+        task.add_done_callback(self.function_tasks.discard)
+        return task
+
+    async def run_function_call(self, function):
+        # Calls beyond the session's cap wait here for a free slot
+        async with self.function_slots:
+            await self.handle_function_call(function)
+        self.last_function_response_time = time.time()
+        # This task is still in function_tasks until it completes. The turn's
+        # function_end is its last function call (e.g. the lookup after a filler)
+        if self.turn and len(self.function_tasks) <= 1:
+            self.turn.update("function_end")
+
+    async def handle_function_call(self, function):
+        """
+        Run one function from a FunctionCallRequest and send its FunctionCallResponse.
+
+        Failures and timeouts are reported in that function's response only, so
+        they never affect the other functions of the same request.
+        """
+        function_name = function.get("name")
+        function_call_id = function.get("id")
+        inject_message = None
+        start_time = time.time()
+        try:
+            parameters = json.loads(function.get("arguments") or "{}")
+            logger.info(f"Function call received: {function_name}")
+            logger.info(f"Parameters: {parameters}")
+
+            if function_name == "agent_filler":
+                result = await asyncio.wait_for(
+                    self._execute_function(function_name, parameters),
+                    timeout=FUNCTION_CALLS["timeout"],
+                )
+                # Respond first, then inject the filler message
+                inject_message = result["inject_message"]
+                content = json.dumps(result["function_response"])
+            else:
+                # Served pre-serialized from the cache when the function has a policy
+                content = await asyncio.wait_for(
+                    FUNCTION_CACHE.call(
+                        function_name,
+                        parameters,
+                        lambda: self._execute_function(function_name, parameters),
+                    ),
+                    timeout=FUNCTION_CALLS["timeout"],
+                )
+                execution_time = time.time() - start_time
+                logger.info(f"Function Execution Latency: {execution_time:.3f}s")
+                FUNCTION_LATENCY.observe(execution_time, function=function_name)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Function {function_name} timed out after {FUNCTION_CALLS['timeout']}s"
+            )
+            content = json.dumps({"error": f"Function {function_name} timed out"})
+        except Exception as e:
+            logger.error(f"Error executing function: {str(e)}")
+            content = json.dumps({"error": str(e)})
+
+        await self.send_function_response(function_call_id, function_name, content)
+        if inject_message:
+            await self.say(inject_message["message"])
+
+    async def play_prerendered(self, message):
+        """
+        Play message from the pre-rendered TTS cache through the Speaker and show
+        it in the conversation. Returns False if it has not been rendered.
+        """
+        pcm = await asyncio.to_thread(TTS_CACHE.get, message, self.agent_templates.voiceModel)
+        if pcm is None:
+            return False
+        socketio.emit(
+            "conversation_update",
+            {"type": "ConversationText", "role": "assistant", "content": message},
+            to=self.sid,
+        )
+        logger.info(f"Playing pre-rendered audio: {message}")
+        # Queue in chunks, like agent audio, so a barge-in can drop the rest
+        bytes_per_sec = self.agent_templates.agent_audio_bytes_per_sec
+        chunk_bytes = int(bytes_per_sec * AUDIO_STREAM["chunk_secs"]) // 2 * 2
+        for start in range(0, len(pcm), chunk_bytes):
+            await self.speaker.play(pcm[start : start + chunk_bytes])
+        return True
+
+    async def say(self, message):
+        """Speak a fixed message: pre-rendered audio when available, otherwise InjectAgentMessage."""
+        if not await self.play_prerendered(message):
+            self.injected_messages.add(message)
+            await inject_agent_message(
+                self.ws, {"type": "InjectAgentMessage", "message": message}
+            )
+
+    async def end_call(self, function):
+        """
+        Respond to end_call, let the farewell play out, then close the websocket.
+        Returns False (leaving the session open) if the farewell could not be prepared.
+        """
+        function_name = function.get("name")
+        function_call_id = function.get("id")
+        try:
+            parameters = json.loads(function.get("arguments") or "{}")
+            logger.info(f"Function call received: {function_name}")
+            logger.info(f"Parameters: {parameters}")
+            result = await self._execute_function(function_name, parameters)
+        except Exception as e:
+            logger.error(f"Error executing function: {str(e)}")
+            await self.send_function_response(
+                function_call_id, function_name, json.dumps({"error": str(e)})
+            )
+            return False
+
+        await self.send_function_response(
+            function_call_id, function_name, json.dumps(result["function_response"])
+        )
+
+        # Then wait for farewell sequence to complete
+        if await self.play_prerendered(result["inject_message"]["message"]):
+            await wait_for_playback_completion(self.speaker, self.playback_done)
+        else:
+            await wait_for_farewell_completion(
+                self.ws,
+                self.speaker,
+                result["inject_message"],
+                self.playback_done,
+            )
+
+        # Finally send the close message and exit
+        logger.info(f"Sending ws close message")
+        await close_websocket_with_timeout(self.ws)
+        return True
+
+    def start_turn(self):
+        """Begin timing a new user turn."""
+        self.turn = TurnTimings()
+        if self.speaker:
+            self.speaker.turn = self.turn
+
+    def finish_turn(self, audio_done=True):
+        """
+        Record the current turn's stage latencies once the agent's answer is done
+        (audio_done), or whatever stages were reached when the user speaks again.
+        """
+        turn, self.turn = self.turn, None
+        if self.speaker:
+            self.speaker.turn = None
+        if not turn:
+            return
+        if audio_done:
+            turn.mark("agent_audio_done")
+        durations = turn.finish()
+        if durations:
+            logger.info(
+                "Turn Latency: "
+                + ", ".join(f"{stage}={secs:.3f}s" for stage, secs in durations.items())
+            )
+
+    def resample_browser_audio(self, audio_bytes, sample_rate):
+        """Convert browser PCM at sample_rate to the input rate negotiated with Deepgram."""
+        target_rate = self.agent_templates.user_audio_sample_rate
+        if self.resampler is None or self.resampler.in_rate != sample_rate:
+            self.resampler = StreamingResampler(sample_rate, target_rate)
+        return self.resampler.process(audio_bytes)
+
+    def audio_stats(self):
+        """Mic queue depth, drops and send rate for this session."""
+        return self.mic_audio_queue.stats() if self.mic_audio_queue else {}
+
     async def run(self):
+        # Logs from this task and everything it starts go to this session's browser
+        SESSION_SID.set(self.sid)
+        self.loop = asyncio.get_running_loop()
         if not await self.setup():
             return
 
+        self.playback_done = asyncio.Event()
+        self.function_slots = asyncio.Semaphore(FUNCTION_CALLS["max_concurrent"])
         self.is_running = True
         try:
             # Only start the microphone if not using browser audio
@@ -389,14 +620,28 @@ class VoiceAgent:
             logger.error(f"Error in run: {e}")
         finally:
             self.is_running = False
+            for task in list(self.function_tasks):
+                task.cancel()
             self.cleanup()
+            if self.mic_audio_queue and self.mic_audio_queue.frames_dropped:
+                logger.warning(
+                    f"Mic audio frames dropped this session: {self.audio_stats()}"
+                )
             if self.ws:
                 await self.ws.close()
 
 
 class Speaker:
-    def __init__(self, agent_audio_sample_rate=None, browser_output=False):
+    def __init__(
+        self,
+        agent_audio_sample_rate=None,
+        browser_output=False,
+        sid=None,
+        jitter_buffer=False,
+    ):
         self._queue = None
+        self._jitter = None
+        self._audio = None
         self._stream = None
         self._thread = None
         self._stop = None
@@ -404,74 +649,258 @@ class Speaker:
             agent_audio_sample_rate if agent_audio_sample_rate else 16000
         )
         self.browser_output = browser_output
+        self.sid = sid
+        # Pace browser output through a jitter buffer instead of forwarding chunks as they arrive
+        self.jitter_buffer = jitter_buffer and browser_output
+        # Barge-in state: chunks from an older generation are dropped by _play
+        self.generation = 0
+        self._flush_requested_at = 0.0
+        self.last_barge_in_latency = None
+        self.turn = None  # TurnTimings of the VoiceAgent's current turn, for first_audio_played
+        # Playback accounting: bytes accepted by play() but not yet written/emitted,
+        # and the wall-clock time at which everything emitted so far finishes playing
+        self._bytes_per_sec = 2 * self.agent_audio_sample_rate
+        self._accounting_lock = threading.Lock()
+        self._pending_bytes = 0
+        self._played_until = 0.0
 
     def __enter__(self):
-        audio = pyaudio.PyAudio()
-        self._stream = audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.agent_audio_sample_rate,
-            input=False,
-            output=True,
-        )
+        # Browser sessions never touch the server's sound card
+        if not self.browser_output:
+            self._audio = pyaudio.PyAudio()
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.agent_audio_sample_rate,
+                input=False,
+                output=True,
+            )
+        else:
+            if self.jitter_buffer:
+                self._jitter = JitterBuffer(self.agent_audio_sample_rate)
+            # Negotiate the browser audio format once per session
+            socketio.emit(
+                "audio_format",
+                audio_format_message(
+                    self.agent_audio_sample_rate,
+                    (
+                        self._jitter.packet_secs
+                        if self._jitter
+                        else AGENT_AUDIO_PACKET_SECS
+                    ),
+                ),
+                to=self.sid,
+            )
         self._queue = janus.Queue()
         self._stop = threading.Event()
+        # The playback thread logs on behalf of the session that created it
         self._thread = threading.Thread(
-            target=_play,
-            args=(self._queue, self._stream, self._stop, self.browser_output),
-            daemon=True,
+            target=contextvars.copy_context().run, args=(_play, self), daemon=True
         )
         self._thread.start()
 
     def __exit__(self, exc_type, exc_value, traceback):
         self._stop.set()
         self._thread.join()
-        self._stream.close()
+        self._close()
+
+    async def __aenter__(self):
+        self.__enter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # The playback thread can take a queue poll (or a PyAudio write) to notice
+        # the stop; wait for it off the shared loop so other sessions keep running
+        self._stop.set()
+        await asyncio.to_thread(self._thread.join)
+        self._close()
+
+    def _close(self):
+        if self._jitter and self._jitter.underruns:
+            logger.warning(f"Browser audio jitter buffer: {self._jitter.stats()}")
+        self._jitter = None
+        if self._stream:
+            self._stream.close()
+        if self._audio:
+            self._audio.terminate()
         self._stream = None
+        self._audio = None
         self._queue = None
         self._thread = None
         self._stop = None
 
     async def play(self, data):
-        return await self._queue.async_q.put(data)
+        # Tag each chunk with the current generation so a barge-in can invalidate it
+        with self._accounting_lock:
+            self._pending_bytes += len(data)
+        return await self._queue.async_q.put((self.generation, data))
+
+    def _played(self, nbytes):
+        """Called by the playback thread once nbytes were written locally or emitted."""
+        turn = self.turn
+        if turn is not None:
+            turn.mark("first_audio_played")
+        with self._accounting_lock:
+            self._pending_bytes = max(self._pending_bytes - nbytes, 0)
+            self._played_until = (
+                max(self._played_until, time.monotonic()) + nbytes / self._bytes_per_sec
+            )
+
+    def pending_bytes(self):
+        """
+        Bytes handed to play() that have not yet left the server. A trailing
+        half sample, held back until more audio completes it, is not counted.
+        """
+        with self._accounting_lock:
+            return self._pending_bytes // 2 * 2
+
+    def pending_playback_secs(self):
+        """Seconds until all audio handed to play() has finished playing."""
+        with self._accounting_lock:
+            in_flight = max(self._played_until - time.monotonic(), 0.0)
+            return self._pending_bytes / self._bytes_per_sec + in_flight
+
+    def notify_output_done(self):
+        """Ask the browser to acknowledge (audio_playback_done) once its scheduled audio ends."""
+        if self.browser_output:
+            socketio.emit("audio_output_done", to=self.sid)
+
+    def stats(self):
+        """Jitter buffer depth and underruns (browser output with jitter buffer only)."""
+        return self._jitter.stats() if self._jitter else {}
 
     def stop(self):
+        """
+        Barge-in: silence the agent immediately.
+
+        Bumps the generation so chunks already queued or held by the playback
+        thread are dropped, clears buffered audio, and wakes the playback
+        thread with a flush marker. The playback thread then tells the browser
+        to drop scheduled audio (or aborts the local PyAudio write) and logs
+        the time from this call to silence.
+
+        Does nothing (and returns False) when the agent is already silent, so
+        barge-in latency is only measured for audio that was actually cut off.
+        """
+        with self._accounting_lock:
+            if self._pending_bytes < 2 and self._played_until <= time.monotonic():
+                return False
+            self._pending_bytes = 0
+            self._played_until = 0.0
+        self.generation += 1
+        self._flush_requested_at = time.perf_counter()
+        if self._jitter:
+            self._jitter.clear()
         if self._queue and self._queue.async_q:
             while not self._queue.async_q.empty():
                 try:
                     self._queue.async_q.get_nowait()
                 except janus.QueueEmpty:
                     break
+            self._queue.async_q.put_nowait((self.generation, None))
+        return True
 
 
-def _play(audio_out, stream, stop, browser_output=False):
-    # Sequence counter for browser audio chunks
+# Local PyAudio writes are split into slices this long so a barge-in can cut them short
+LOCAL_WRITE_SECS = 0.02
+
+
+def _play(speaker):
+    audio_out = speaker._queue
+    stream = speaker._stream
+    stop = speaker._stop
+    browser_output = speaker.browser_output
+    jitter = speaker._jitter
+    # Sequence counter for browser audio packets
     seq = 0
+    packetizer = AudioPacketizer(speaker.agent_audio_sample_rate, AGENT_AUDIO_PACKET_SECS)
+    write_slice = int(speaker.agent_audio_sample_rate * LOCAL_WRITE_SECS) * 2
+
+    def emit_packet(pcm, flags=0):
+        nonlocal seq
+        try:
+            # A single bytes argument goes out as a Socket.IO binary attachment
+            socketio.emit(
+                "audio_packet", pack_audio_packet(seq, pcm, flags), to=speaker.sid
+            )
+            seq += 1
+            speaker._played(len(pcm))
+        except Exception as e:
+            logger.error(f"Error sending audio to browser: {e}")
+
+    def flush():
+        packetizer.clear()
+        if jitter:
+            jitter.clear()
+        if browser_output:
+            try:
+                # Browser stops every source it has scheduled but not yet played
+                socketio.emit("audio_flush", {"seq": seq}, to=speaker.sid)
+            except Exception as e:
+                logger.error(f"Error sending audio flush to browser: {e}")
+        latency = time.perf_counter() - speaker._flush_requested_at
+        speaker.last_barge_in_latency = latency
+        BARGE_IN_LATENCY.observe(latency)
+        logger.info(f"Barge-in Latency: {latency * 1000:.1f}ms")
+
+    def receive(timeout):
+        """Next live chunk, or None after handling a flush marker or dropping a stale chunk."""
+        generation, data = audio_out.sync_q.get(True, timeout)
+        if generation != speaker.generation:
+            return None
+        if data is None:
+            flush()
+        return data
+
+    if jitter is not None:
+        _play_paced(speaker, receive, emit_packet)
+        return
+
     while not stop.is_set():
         try:
-            data = audio_out.sync_q.get(True, 0.05)
+            data = receive(0.05)
+            if not data:
+                continue
 
-            # If browser output is enabled, send audio to browser via WebSocket
+            # If browser output is enabled, send fixed-duration binary packets to the browser
             if browser_output and socketio:
-                try:
-                    # Send audio data to browser clients with sample rate information
-                    socketio.emit(
-                        "audio_output",
-                        {
-                            "audio": data,
-                            "sampleRate": AGENT_AUDIO_SAMPLE_RATE,
-                            "seq": seq,
-                        },
-                    )
-                    seq += 1
-                except Exception as e:
-                    logger.error(f"Error sending audio to browser: {e}")
+                for packet in packetizer.push(data):
+                    emit_packet(packet)
 
             elif not browser_output and stream is not None:
-                stream.write(data)
+                generation = speaker.generation
+                for i in range(0, len(data), write_slice):
+                    if generation != speaker.generation:
+                        break
+                    chunk = data[i : i + write_slice]
+                    stream.write(chunk)
+                    speaker._played(len(chunk))
+        except queue.Empty:
+            # Source went idle: send the tail of the utterance instead of holding it
+            if browser_output:
+                tail = packetizer.flush()
+                if tail:
+                    emit_packet(tail, AUDIO_PACKET_FLAG_END)
+
+
+def _play_paced(speaker, receive, emit_packet):
+    """Browser output through a jitter buffer: fixed-size packets released on a wall clock."""
+    jitter = speaker._jitter
+    while not speaker._stop.is_set():
+        wait = jitter.next_due_in()
+        try:
+            data = receive(0.05 if wait is None else min(wait, 0.05))
+            # Take everything that has already arrived before releasing packets
+            while True:
+                if data:
+                    jitter.push(data)
+                data = receive(0)
         except queue.Empty:
             pass
 
+        for packet, is_last in jitter.pop_due():
+            emit_packet(packet, AUDIO_PACKET_FLAG_END if is_last else 0)
+
 
 async def inject_agent_message(ws, inject_message):
     """Simple helper to inject an agent message."""
@@ -488,7 +917,35 @@ async def close_websocket_with_timeout(ws, timeout=5):
         logger.error(f"Error during websocket closure: {e}")
 
 
-async def wait_for_farewell_completion(ws, speaker, inject_message):
+async def wait_for_playback_completion(speaker, playback_done=None, margin=0.25, max_wait=10):
+    """
+    Wait until the speaker has finished playing everything queued so far.
+
+    The wait is computed from the bytes actually queued in the Speaker. For
+    browser output, once all audio has been emitted the browser is asked to
+    acknowledge with audio_playback_done; the ack ends the wait early and the
+    computed playback time (plus margin) bounds it otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+
+    # Audio still queued or being paced out by the playback thread
+    while speaker.pending_bytes() > 0 and loop.time() < deadline:
+        await asyncio.sleep(min(speaker.pending_playback_secs(), 0.05))
+
+    timeout = max(min(speaker.pending_playback_secs() + margin, deadline - loop.time()), 0)
+    if playback_done is not None and speaker.browser_output:
+        playback_done.clear()
+        speaker.notify_output_done()
+        try:
+            await asyncio.wait_for(playback_done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    else:
+        await asyncio.sleep(timeout)
+
+
+async def wait_for_farewell_completion(ws, speaker, inject_message, playback_done=None):
     """Wait for the farewell message to be spoken completely by the agent."""
     # Send the farewell message
     await inject_agent_message(ws, inject_message)
@@ -529,8 +986,8 @@ async def wait_for_farewell_completion(ws, speaker, inject_message):
         except json.JSONDecodeError:
             continue
 
-    # Give audio time to play completely
-    await asyncio.sleep(3.5)
+    # Wait only as long as the farewell audio actually takes to play
+    await wait_for_playback_completion(speaker, playback_done)
 
 
 # Get available audio devices
@@ -556,8 +1013,8 @@ def get_audio_devices():
 # Flask routes
 @app.route("/")
 def index():
-    # Get the sample data from MOCK_DATA
-    sample_data = MOCK_DATA.get("sample_data", [])
+    # Get the sample data from the (lazily generated) mock data
+    sample_data = get_mock_data().get("sample_data", [])
     return render_template("index.html", sample_data=sample_data)
 
 
@@ -632,92 +1089,125 @@ def get_tts_models():
         return jsonify({"error": str(e)}), 500
 
 
-voice_agent = None
-
+@app.route("/metrics")
+def metrics():
+    # Prometheus text exposition format
+    return app.response_class(
+        METRICS.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.route("/sessions")
+def get_sessions():
+    # Session counts and limits for admission control / load balancer checks
+    audio = [agent.audio_stats() for agent in sessions.values()]
+    return {
+        **sessions.stats(),
+        "event_loops": loop_pool.stats(),
+        "mic_audio": {
+            "queue_depth": sum(a.get("depth", 0) for a in audio),
+            "frames_dropped": sum(a.get("frames_dropped", 0) for a in audio),
+            "send_rate_messages_per_sec": round(
+                sum(a.get("send_rate_messages_per_sec", 0) for a in audio), 2
+            ),
+            "send_rate_bytes_per_sec": round(
+                sum(a.get("send_rate_bytes_per_sec", 0) for a in audio), 2
+            ),
+        },
+    }
+
+
+def start_voice_agent(voice_agent):
+    """Schedule a session's run() on the shared event loop pool."""
+
+    def on_done(future):
+        if not future.cancelled() and future.exception():
+            session_logger(logger, voice_agent.sid).error(
+                f"Error in voice agent session: {future.exception()}"
+            )
+        # Free the slot once the session ends on its own (e.g. end_call)
+        sessions.remove(voice_agent.sid, voice_agent)
 
-def run_async_voice_agent():
-    try:
-        # Create a new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    _, voice_agent.task = loop_pool.submit(voice_agent.run())
+    voice_agent.task.add_done_callback(on_done)
 
-        # Set the loop in the voice agent
-        voice_agent.set_loop(loop)
 
-        try:
-            # Run the voice agent
-            loop.run_until_complete(voice_agent.run())
-        except asyncio.CancelledError:
-            logger.info("Voice agent task was cancelled")
-        except Exception as e:
-            logger.error(f"Error in voice agent thread: {e}")
-        finally:
-            # Clean up the loop
-            try:
-                # Cancel all running tasks
-                pending = asyncio.all_tasks(loop)
-                for task in pending:
-                    task.cancel()
-
-                # Allow cancelled tasks to complete
-                if pending:
-                    loop.run_until_complete(
-                        asyncio.gather(*pending, return_exceptions=True)
-                    )
-
-                loop.run_until_complete(loop.shutdown_asyncgens())
-            finally:
-                loop.close()
-    except Exception as e:
-        logger.error(f"Error in voice agent thread setup: {e}")
+def stop_voice_agent(sid):
+    """Stop and unregister the voice agent session for a Socket.IO client."""
+    voice_agent = sessions.remove(sid)
+    if voice_agent:
+        voice_agent.is_running = False
+        if voice_agent.task:
+            # Cancels only this session's task; the shared loop keeps running
+            voice_agent.task.cancel()
+    return voice_agent
 
 
 @socketio.on("start_voice_agent")
 def handle_start_voice_agent(data=None):
-    global voice_agent
-    logger.info(f"Starting voice agent with data: {data}")
-    if voice_agent is None:
-        # Get persona from data or default to hanuman
-        persona = data.get("persona", "hanuman") if data else "hanuman"
-        voiceModel = (
-            data.get("voiceModel", "aura-2-thalia-en") if data else "aura-2-thalia-en"
+    sid = request.sid
+    log = session_logger(logger, sid)
+    log.info(f"Starting voice agent with data: {data}")
+    if sid in sessions:
+        return
+    # Get persona from data or default to hanuman
+    persona = data.get("persona", "hanuman") if data else "hanuman"
+    voiceModel = (
+        data.get("voiceModel", "aura-2-thalia-en") if data else "aura-2-thalia-en"
+    )
+    # Get voice name from data or default to empty string, which uses the Model's voice name in the backend
+    voiceName = data.get("voiceName", "") if data else ""
+    # Check if browser is handling audio capture
+    browser_audio = data.get("browserAudio", False) if data else False
+
+    voice_agent = VoiceAgent(
+        persona=persona,
+        voiceModel=voiceModel,
+        voiceName=voiceName,
+        browser_audio=browser_audio,
+        sid=sid,
+    )
+    if data:
+        voice_agent.input_device_id = data.get("inputDeviceId")
+        voice_agent.output_device_id = data.get("outputDeviceId")
+
+    if not sessions.add(sid, voice_agent):
+        stats = sessions.stats()
+        log.warning(
+            f"Rejecting voice agent session {sid}: {stats['active']}/{stats['max']} sessions active"
         )
-        # Get voice name from data or default to empty string, which uses the Model's voice name in the backend
-        voiceName = data.get("voiceName", "") if data else ""
-        # Check if browser is handling audio capture
-        browser_audio = data.get("browserAudio", False) if data else False
-
-        voice_agent = VoiceAgent(
-            persona=persona,
-            voiceModel=voiceModel,
-            voiceName=voiceName,
-            browser_audio=browser_audio,
+        socketio.emit(
+            "session_rejected",
+            {"reason": "capacity", "active": stats["active"], "max": stats["max"]},
+            to=sid,
         )
-        if data:
-            voice_agent.input_device_id = data.get("inputDeviceId")
-            voice_agent.output_device_id = data.get("outputDeviceId")
-        # Start the voice agent in a background thread
-        socketio.start_background_task(target=run_async_voice_agent)
+        return
+
+    start_voice_agent(voice_agent)
 
 
 @socketio.on("stop_voice_agent")
 def handle_stop_voice_agent():
-    global voice_agent
-    if voice_agent:
-        voice_agent.is_running = False
-        if voice_agent.loop and not voice_agent.loop.is_closed():
-            try:
-                # Cancel all running tasks
-                for task in asyncio.all_tasks(voice_agent.loop):
-                    task.cancel()
-            except Exception as e:
-                logger.error(f"Error stopping voice agent: {e}")
-        voice_agent = None
+    stop_voice_agent(request.sid)
+
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    if stop_voice_agent(request.sid):
+        logger.info(f"Client {request.sid} disconnected; voice agent session cleaned up")
+
+
+@socketio.on("audio_playback_done")
+def handle_audio_playback_done(data=None):
+    voice_agent = sessions.get(request.sid)
+    if voice_agent and voice_agent.playback_done and voice_agent.loop:
+        voice_agent.loop.call_soon_threadsafe(voice_agent.playback_done.set)
 
 
 @socketio.on("audio_data")
 def handle_audio_data(data):
-    global voice_agent
+    voice_agent = sessions.get(request.sid)
+    log = session_logger(logger, request.sid)
     if voice_agent and voice_agent.is_running and voice_agent.browser_audio:
         try:
             # Get the audio buffer and sample rate
@@ -735,52 +1225,55 @@ def handle_audio_data(data):
                         audio_bytes = audio_buffer.tobytes()
 
                         # Log detailed info about the first chunk
-                        if not hasattr(handle_audio_data, "first_log_done"):
+                        if not voice_agent.first_audio_logged:
                             import numpy as np
 
                             # Peek at the data to verify it's in the right format
                             int16_peek = np.frombuffer(
                                 audio_buffer[:20], dtype=np.int16
                             )
-                            logger.info(f"First few samples: {int16_peek}")
+                            log.info(f"First few samples: {int16_peek}")
                     elif isinstance(audio_buffer, bytes):
                         # Already bytes, use directly
                         audio_bytes = audio_buffer
                     else:
                         # Unexpected type, try to convert and log a warning
-                        logger.warning(
+                        log.warning(
                             f"Unexpected audio buffer type: {type(audio_buffer)}"
                         )
                         try:
                             audio_bytes = bytes(audio_buffer)
                         except Exception as e:
-                            logger.error(
+                            log.error(
                                 f"Failed to convert audio buffer to bytes: {e}"
                             )
                             return
 
                     # Log the first time we receive audio data
-                    if not hasattr(handle_audio_data, "first_log_done"):
-                        logger.info(
+                    if not voice_agent.first_audio_logged:
+                        log.info(
                             f"Received first browser audio chunk: {len(audio_bytes)} bytes, sample rate: {sample_rate}Hz"
                         )
-                        handle_audio_data.first_log_done = True
+                        voice_agent.first_audio_logged = True
+
+                    audio_bytes = voice_agent.resample_browser_audio(
+                        audio_bytes, int(sample_rate)
+                    )
 
                     # Put the audio data in the queue for processing
                     if voice_agent.loop and not voice_agent.loop.is_closed():
-                        asyncio.run_coroutine_threadsafe(
-                            voice_agent.mic_audio_queue.put(audio_bytes),
-                            voice_agent.loop,
+                        voice_agent.loop.call_soon_threadsafe(
+                            voice_agent.mic_audio_queue.put_latest, audio_bytes
                         )
                 except Exception as e:
-                    logger.error(
+                    log.error(
                         f"Error converting audio buffer: {e}, type: {type(audio_buffer)}"
                     )
                     import traceback
 
-                    logger.error(traceback.format_exc())
+                    log.error(traceback.format_exc())
         except Exception as e:
-            logger.error(f"Error processing browser audio data: {e}")
+            log.error(f"Error processing browser audio data: {e}")
 
 
 if __name__ == "__main__":
@@ -794,4 +1287,8 @@ if __name__ == "__main__":
     print("\nPress Ctrl+C to stop the server\n")
     print("=" * 60 + "\n")
 
+    if AUDIO_ASSET_CACHE["preload"]:
+        # Transcode and load the Chalisa verse audio while the server starts
+        threading.Thread(target=AUDIO_ASSETS.preload, daemon=True).start()
+
     socketio.run(app, debug=True)
@@ -2,14 +2,81 @@ from .business_logic import (
     prepare_agent_filler_message,
     prepare_farewell_message,
 )
+from .function_cache import FUNCTION_CACHE, CachePolicy, EncodedResult
+from .audio_assets import AUDIO_ASSETS
 from .stories import STORIES
+import asyncio
+import logging
 import os
-import wave
+from collections import namedtuple
 from .hanuman_chalisa import HANUMAN_CHALISA_STEPS
 
+logger = logging.getLogger(__name__)
+
 # Base directory for audio assets; can be set via env var
 AUDIO_BASE_DIR = os.environ.get("AUDIO_BASE_DIR", "/Users/admin/Desktop/projects/flask-agent-function-calling-demo/common")
 
+# One compiled Hanuman Chalisa step: its teach_hanuman_chalisa result (pre-encoded)
+# and its registered playback AudioAsset, or None if the step has no usable audio
+ChalisaLesson = namedtuple("ChalisaLesson", ["index", "title", "result", "playback"])
+
+
+def resolve_audio_path(path):
+    """Absolute path for an audio asset; relative paths are under AUDIO_BASE_DIR."""
+    return path if os.path.isabs(path) else os.path.join(AUDIO_BASE_DIR, path)
+
+
+def _compile_playback(step):
+    """Resolve, validate and register a step's playback_audio_path once, at import (headers only)."""
+    path = step.get("playback_audio_path")
+    if not path:
+        return None
+    path = resolve_audio_path(path)
+    try:
+        return AUDIO_ASSETS.register(path)
+    except FileNotFoundError:
+        logger.warning(f"Audio file not found for {step['title']}: {path}")
+    except (ValueError, OSError) as e:
+        logger.warning(f"Unusable audio for {step['title']}: {path} ({e})")
+    return None
+
+
+def compile_chalisa_lessons(steps):
+    """Build every step's teach_hanuman_chalisa response once."""
+    # Teaching pattern: playback (if available) -> say verse -> meaning in English -> ask a question / repeat
+    engage = "Would you like to repeat this line with me?"
+    total = len(steps)
+    lessons = []
+    for index, step in enumerate(steps):
+        speech = (
+            ("Title: " + step["title"] + "\n")
+            + ("Text in English: " + step.get("text_english") + "\n")
+            + ("Translation in English: " + step["translation_english"] + "\n")
+            + ("Learning in English: " + step["learning_english"] + "\n")
+            + f"Now, {engage}"
+        )
+        result = EncodedResult(
+            {
+                "persona": "hanuman",
+                "index": index,
+                "total": total,
+                "output": speech,
+                "next_step_index": index + 1 if index + 1 < total else None,
+            }
+        )
+        lessons.append(ChalisaLesson(index, step["title"], result, _compile_playback(step)))
+    return tuple(lessons)
+
+
+CHALISA_LESSONS = compile_chalisa_lessons(HANUMAN_CHALISA_STEPS)
+
+UNSUPPORTED_PERSONA_RESULT = EncodedResult(
+    {
+        "error": "unsupported_persona",
+        "message": "This function is only available for the Hanuman persona.",
+    }
+)
+
 async def agent_filler(websocket, params):
     """
     Handle agent filler messages while maintaining proper function call protocol.
@@ -66,50 +133,18 @@ async def teach_hanuman_chalisa(params):
     Params:
     - persona: must be 'hanuman'
     - step_index: optional integer (0-based). If omitted, start from 0.
+
+    Steps are compiled at import (CHALISA_LESSONS), so this is a lookup.
     """
     persona = (params.get("persona") or "").lower()
     step_index = params.get("step_index")
 
     if persona != "hanuman":
-        return {
-            "error": "unsupported_persona",
-            "message": "This function is only available for the Hanuman persona.",
-        }
+        return UNSUPPORTED_PERSONA_RESULT
 
-    steps = HANUMAN_CHALISA_STEPS
-    total = len(steps)
+    total = len(CHALISA_LESSONS)
     index = step_index if isinstance(step_index, int) and 0 <= step_index < total else 0
-
-    step = steps[index]
-    next_index = index + 1 if index + 1 < total else None
-
-    # Teaching pattern: playback (if available) -> say verse -> meaning in English -> ask a question / repeat
-    engage = "Would you like to repeat this line with me?"
-    verse_line = step.get("text_english") or step.get("text_hindi") or ""
-    meaning_en = step.get("translation_english") or ""
-
-    # Resolve playback path if present (support absolute or relative under AUDIO_BASE_DIR)
-    playback = step.get("playback_audio_path")
-    if playback and not os.path.isabs(playback):
-        playback = os.path.join(AUDIO_BASE_DIR, playback)
-    
-    print(f"playback: {playback}")
-
-    speech = (
-        ("Title: " + step["title"] + "\n")
-        + ("Text in English: " + step.get("text_english") + "\n")
-        + ("Translation in English: " + step["translation_english"] + "\n")
-        + ("Learning in English: " + step["learning_english"] + "\n")
-        + f"Now, {engage}"
-    )
-
-    return {
-        "persona": persona,
-        "index": index,
-        "total": total,
-        "output": speech,
-        "next_step_index": next_index,
-    }
+    return CHALISA_LESSONS[index].result
 
 
 async def play_hanuman_chalisa(params):
@@ -117,7 +152,8 @@ async def play_hanuman_chalisa(params):
 
     Params:
     - persona: must be 'hanuman'
-    - path: absolute or relative path (under AUDIO_BASE_DIR) to a mono 16kHz PCM WAV file
+    - path: absolute or relative path (under AUDIO_BASE_DIR) to a mono 16kHz PCM WAV file,
+      or an MP3 file (transcoded to that format once, if ffmpeg is installed)
     """
     persona = (params.get("persona") or "").lower()
     audio_path = params.get("path")
@@ -132,53 +168,42 @@ async def play_hanuman_chalisa(params):
         return {"error": "invalid_path", "message": "Provide 'path' to an audio file"}
 
     # Resolve relative paths
-    if not os.path.isabs(audio_path):
-        audio_path = os.path.join(AUDIO_BASE_DIR, audio_path)
+    audio_path = resolve_audio_path(audio_path)
 
-    if not os.path.exists(audio_path):
+    # Validated (and an MP3 transcoded) once, off the loop, then served from the
+    # shared asset cache; the caller streams the audio with AUDIO_ASSETS.stream(result["path"])
+    try:
+        asset = await asyncio.to_thread(AUDIO_ASSETS.playable, audio_path)
+    except FileNotFoundError:
         return {"error": "not_found", "message": f"File not found: {audio_path}"}
+    except ValueError as e:
+        return {"error": "unsupported_format", "message": str(e)}
+    except OSError as e:
+        return {"error": "read_error", "message": str(e)}
 
-    # Only wav PCM is streamed sample-perfect; for mp3, return metadata to let UI/server handle decoding later
-    ext = os.path.splitext(audio_path)[1].lower()
-    if ext != ".wav":
+    # MP3 is transcoded to PCM when ffmpeg is available; otherwise it streams as MP3 frames
+    if asset.format != "wav":
         return {
             "persona": persona,
             "path": audio_path,
-            "format": ext.lstrip("."),
-            "note": "Non-WAV provided; client/server should decode to PCM for playback",
+            "format": asset.format,
+            "sample_rate": asset.sample_rate,
+            "duration_secs": round(asset.duration, 3),
         }
 
-    try:
-        with wave.open(audio_path, "rb") as wf:
-            nchannels = wf.getnchannels()
-            sampwidth = wf.getsampwidth()
-            framerate = wf.getframerate()
-            comptype = wf.getcomptype()
-
-            if comptype != "NONE":
-                return {"error": "unsupported_format", "message": "Compressed WAV not supported"}
-            if nchannels != 1 or sampwidth != 2 or framerate != 16000:
-                return {
-                    "error": "unsupported_format",
-                    "message": "Audio must be mono 16-bit PCM at 16000 Hz",
-                }
-
-            frames_per_chunk = 16000
-            chunks = []
-            while True:
-                frames = wf.readframes(frames_per_chunk)
-                if not frames:
-                    break
-                chunks.append(frames)
-
+    if asset.channels != 1 or asset.sample_width != 2 or asset.sample_rate != 16000:
         return {
-            "persona": persona,
-            "path": audio_path,
-            "audio_chunks": chunks,
-            "sample_rate": 16000,
+            "error": "unsupported_format",
+            "message": "Audio must be mono 16-bit PCM at 16000 Hz",
         }
-    except Exception as e:
-        return {"error": "read_error", "message": str(e)}
+
+    return {
+        "persona": persona,
+        "path": audio_path,
+        "format": "wav",
+        "sample_rate": asset.sample_rate,
+        "duration_secs": round(asset.duration, 3),
+    }
 
 # Function definitions that will be sent to the Voice Agent API
 FUNCTION_DEFINITIONS = [
@@ -265,3 +290,12 @@ FUNCTION_MAP = {
     "teach_hanuman_chalisa": teach_hanuman_chalisa
     # "play_hanuman_chalisa": play_hanuman_chalisa,
 }
+
+# Result caching per function. Stories are static; teach_hanuman_chalisa needs no
+# cache: its responses are compiled at import.
+FUNCTION_CACHE_POLICIES = {
+    "tell_a_story": CachePolicy(case_insensitive=("persona",)),
+}
+
+for _name, _policy in FUNCTION_CACHE_POLICIES.items():
+    FUNCTION_CACHE.register(_name, _policy)
@@ -2,6 +2,7 @@ from common.agent_functions import FUNCTION_DEFINITIONS
 from common.stories import get_persona_topics
 from common.prompt_templates import PROMPT_TEMPLATE
 from datetime import datetime
+import copy
 
 
 VOICE = "aura-2-thalia-en"
@@ -10,9 +11,14 @@ VOICE = "aura-2-thalia-en"
 USER_AUDIO_SAMPLE_RATE = 48000
 USER_AUDIO_SECS_PER_CHUNK = 0.05
 USER_AUDIO_SAMPLES_PER_CHUNK = round(USER_AUDIO_SAMPLE_RATE * USER_AUDIO_SECS_PER_CHUNK)
+# Browser audio is resampled server-side to this rate before it goes to Deepgram.
+# 16kHz is plenty for STT and cuts upstream bandwidth 3x versus 48kHz.
+BROWSER_AUDIO_SAMPLE_RATE = 16000
 
 AGENT_AUDIO_SAMPLE_RATE = 16000
 AGENT_AUDIO_BYTES_PER_SEC = 2 * AGENT_AUDIO_SAMPLE_RATE
+# Agent audio sent to the browser is batched into packets of this duration
+AGENT_AUDIO_PACKET_SECS = 0.04
 
 VOICE_AGENT_URL = "wss://agent.deepgram.com/v1/agent/converse"
 
@@ -71,6 +77,7 @@ class AgentTemplates:
         persona="hanuman",
         voiceModel="aura-2-thalia-en",
         voiceName="",
+        browser_audio=False,
     ):
         self.voiceModel = voiceModel
         if voiceName == "":
@@ -86,8 +93,12 @@ class AgentTemplates:
         self.persona = persona
 
         self.voice_agent_url = VOICE_AGENT_URL
-        self.settings = SETTINGS
-        self.user_audio_sample_rate = USER_AUDIO_SAMPLE_RATE
+        # Each session gets its own copy so concurrent personas don't overwrite each other
+        self.settings = copy.deepcopy(SETTINGS)
+        self.user_audio_sample_rate = (
+            BROWSER_AUDIO_SAMPLE_RATE if browser_audio else USER_AUDIO_SAMPLE_RATE
+        )
+        self.settings["audio"]["input"]["sample_rate"] = self.user_audio_sample_rate
         self.user_audio_secs_per_chunk = USER_AUDIO_SECS_PER_CHUNK
         self.user_audio_samples_per_chunk = USER_AUDIO_SAMPLES_PER_CHUNK
         self.agent_audio_sample_rate = AGENT_AUDIO_SAMPLE_RATE
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import mmap
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from common.audio_stream import iter_mp3_frames, mp3_chunks, paced, parse_wav, pcm_chunks
+from common.audio_transcode import transcode_to_wav
+from common.config import AUDIO_ASSET_CACHE, AUDIO_STREAM
+from common.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+AUDIO_ASSET_LOADS = METRICS.counter(
+    "voice_agent_audio_asset_requests_total",
+    "Audio asset playbacks served from the shared cache (hit) or loaded from disk (miss)",
+)
+AUDIO_ASSET_EVICTIONS = METRICS.counter(
+    "voice_agent_audio_asset_evictions_total",
+    "Audio assets dropped from the shared cache to stay within its byte budget",
+)
+
+AUDIO_ASSET_FORMATS = (".wav", ".mp3")
+
+# Validated metadata of one audio file. For WAV, data_offset/data_length locate
+# the PCM in the file; for MP3 they cover the frames after any ID3 tag. For a
+# transcoded MP3, path is the cached WAV and source is the original file.
+AudioAsset = namedtuple(
+    "AudioAsset",
+    [
+        "path",
+        "format",
+        "sample_rate",
+        "channels",
+        "sample_width",
+        "data_offset",
+        "data_length",
+        "duration",
+        "size_bytes",
+        "source",
+    ],
+    defaults=(None,),
+)
+
+
+def probe_audio_file(path):
+    """Validate an audio file and return its AudioAsset; raises ValueError or OSError."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in AUDIO_ASSET_FORMATS:
+        raise ValueError(f"Unsupported audio format: {ext or 'none'}")
+    size = os.path.getsize(path)
+    if size == 0:
+        raise ValueError("Empty audio file")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if ext == ".wav":
+            offset, length, sample_rate, channels, sample_width = parse_wav(mm)
+            duration = length / (sample_rate * channels * sample_width)
+            return AudioAsset(
+                path, "wav", sample_rate, channels, sample_width, offset, length, duration, size
+            )
+        first = end = None
+        duration = 0.0
+        sample_rate = 0
+        for offset, length, samples, sample_rate in iter_mp3_frames(mm):
+            if first is None:
+                first = offset
+            end = offset + length
+            duration += samples / sample_rate
+    if first is None:
+        raise ValueError("No MPEG Layer III frames found")
+    return AudioAsset(path, "mp3", sample_rate, None, None, first, end - first, duration, size)
+
+
+class AudioAssetRegistry:
+    """
+    Process-wide registry of recorded audio assets.
+
+    register() validates a file once and keeps its metadata for good; it only
+    reads the file's headers, so it is cheap enough for import time. On first
+    use, playable() transcodes MP3 files to linear16 WAV
+    (common/audio_transcode.py) when ffmpeg is available, so they stream as PCM
+    like any other agent audio. The audio
+    itself (raw PCM for WAV, the frames for MP3) is read into one immutable
+    buffer shared read-only by every session; playback hands out memoryview
+    slices of it, so nothing is copied per session. Loaded buffers are kept
+    within budget_bytes, least recently used first out; a session still
+    streaming an evicted asset keeps its buffer alive until it finishes.
+    """
+
+    def __init__(self, budget_bytes=None):
+        self.budget_bytes = (
+            AUDIO_ASSET_CACHE["budget_bytes"] if budget_bytes is None else budget_bytes
+        )
+        self._assets = {}
+        self._buffers = OrderedDict()  # path -> read-only memoryview of the asset's audio
+        self._resident_bytes = 0
+        self._untranscoded = set()  # MP3 paths that play as MP3 (transcoding unavailable)
+        self._lock = threading.Lock()
+
+    def register(self, path):
+        """
+        Validate path (once) and return its AudioAsset; raises ValueError or
+        OSError. Only reads the file's headers; see playable() for transcoding.
+        """
+        path = os.path.abspath(path)
+        asset = self._assets.get(path)
+        if asset is None:
+            asset = probe_audio_file(path)
+            with self._lock:
+                asset = self._assets.setdefault(path, asset)
+        return asset
+
+    def get(self, path):
+        return self._assets.get(os.path.abspath(path))
+
+    def playable(self, path):
+        """
+        AudioAsset for path in the form it is played: an MP3 is transcoded to
+        WAV the first time, if ffmpeg is available. Blocking; raises ValueError
+        or OSError.
+        """
+        asset = self.register(path)
+        if asset.format != "mp3" or asset.path in self._untranscoded:
+            return asset
+        transcoded = transcode_to_wav(asset.path)
+        if transcoded is None:
+            with self._lock:
+                self._untranscoded.add(asset.path)
+            return asset
+        asset = probe_audio_file(transcoded)._replace(source=asset.path)
+        with self._lock:
+            self._assets[asset.source] = asset
+        return asset
+
+    def _buffer(self, asset):
+        with self._lock:
+            buffer = self._buffers.get(asset.path)
+            if buffer is not None:
+                self._buffers.move_to_end(asset.path)
+                AUDIO_ASSET_LOADS.inc(outcome="hit")
+                return buffer
+        AUDIO_ASSET_LOADS.inc(outcome="miss")
+
+        with open(asset.path, "rb") as f:
+            f.seek(asset.data_offset)
+            buffer = memoryview(f.read(asset.data_length))
+        if len(buffer) > self.budget_bytes:
+            # Too big to keep; this playback gets its own copy
+            return buffer
+
+        with self._lock:
+            if asset.path not in self._buffers:
+                self._buffers[asset.path] = buffer
+                self._resident_bytes += len(buffer)
+            buffer = self._buffers[asset.path]
+            self._buffers.move_to_end(asset.path)
+            while self._resident_bytes > self.budget_bytes:
+                _, evicted = self._buffers.popitem(last=False)
+                self._resident_bytes -= len(evicted)
+                AUDIO_ASSET_EVICTIONS.inc()
+        return buffer
+
+    def chunks(self, path, chunk_secs=None):
+        """
+        AudioChunks of path's playable asset, as zero-copy memoryview slices of
+        the shared buffer. Blocking on a cache miss.
+        """
+        asset = self.playable(path)
+        buffer = self._buffer(asset)
+        chunk_secs = chunk_secs or AUDIO_STREAM["chunk_secs"]
+        if asset.format == "wav":
+            frame_bytes = asset.channels * asset.sample_width
+            return pcm_chunks(buffer, asset.sample_rate, frame_bytes, chunk_secs)
+        return mp3_chunks(buffer, chunk_secs)
+
+    async def stream(self, path, chunk_secs=None, lead_secs=None):
+        """Real-time paced chunks of path from the shared cache, loading it off the loop."""
+        chunks = await asyncio.to_thread(self.chunks, path, chunk_secs)
+        async for chunk in paced(chunks, lead_secs):
+            yield chunk
+
+    def prefetch(self, path):
+        """Make path playable and load its audio into the cache ahead of playback."""
+        asset = self.playable(path)
+        self._buffer(asset)
+        return asset
+
+    def preload(self):
+        """
+        Make registered assets playable and load them into the cache, in
+        registration order, while they fit the budget. Blocking.
+        """
+        for path in list(self._assets):
+            try:
+                asset = self.playable(path)
+            except (ValueError, OSError) as e:
+                logger.warning(f"Cannot preload audio {path}: {e}")
+                continue
+            if asset.path in self._buffers:
+                continue
+            if self._resident_bytes + asset.data_length > self.budget_bytes:
+                break
+            self._buffer(asset)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "registered": len(self._assets),
+                "resident": len(self._buffers),
+                "resident_bytes": self._resident_bytes,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+# Process-wide registry; Hanuman Chalisa verse recordings are registered at import
+# of agent_functions and preloaded when the server starts
+AUDIO_ASSETS = AudioAssetRegistry()
+
+METRICS.gauge(
+    "voice_agent_audio_asset_resident_bytes",
+    "Bytes of audio held in the shared audio asset cache",
+    lambda: AUDIO_ASSETS.stats()["resident_bytes"],
+)
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from common.config import MIC_AUDIO_QUEUE
+
+
+class MicAudioQueue(asyncio.Queue):
+    """
+    Bounded asyncio queue for microphone audio with a drop-oldest policy.
+
+    Producers on other threads (the PortAudio callback, Socket.IO handlers)
+    hand frames over with loop.call_soon_threadsafe(queue.put_latest, frame),
+    so they never wait on the event loop. When the queue is full the oldest
+    frame is discarded to keep latency bounded.
+
+    coalesce_max_bytes defaults to MIC_AUDIO_QUEUE["coalesce_max_secs"] of
+    16-bit mono audio at sample_rate.
+    """
+
+    def __init__(
+        self, sample_rate, maxsize=None, coalesce_max_bytes=None, coalesce_window=None
+    ):
+        super().__init__(
+            maxsize=maxsize if maxsize is not None else MIC_AUDIO_QUEUE["max_frames"]
+        )
+        self.coalesce_max_bytes = (
+            coalesce_max_bytes
+            if coalesce_max_bytes is not None
+            else int(sample_rate * 2 * MIC_AUDIO_QUEUE["coalesce_max_secs"])
+        )
+        self.coalesce_window = (
+            coalesce_window
+            if coalesce_window is not None
+            else MIC_AUDIO_QUEUE["coalesce_window"]
+        )
+        self._carry = None  # frame that did not fit into the previous batch
+        self.frames_enqueued = 0
+        self.frames_dropped = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self._started_at = time.monotonic()
+
+    def put_latest(self, data):
+        """Enqueue without blocking, dropping the oldest frame if full. Loop thread only."""
+        if self.full():
+            try:
+                self.get_nowait()
+                self.frames_dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.put_nowait(data)
+        self.frames_enqueued += 1
+
+    async def get_coalesced(self):
+        """
+        Wait for audio and return everything queued as one bytes object.
+
+        Frames are merged until coalesce_max_bytes is reached or, when
+        coalesce_window is set, until the window since the first frame expires.
+        A frame is never split; one that does not fit starts the next batch.
+        """
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            first = await self.get()
+        batch = [first]
+        size = len(first)
+        deadline = time.monotonic() + self.coalesce_window
+
+        while size < self.coalesce_max_bytes:
+            if self.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    data = await asyncio.wait_for(self.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                data = self.get_nowait()
+            if size + len(data) > self.coalesce_max_bytes:
+                self._carry = data
+                break
+            batch.append(data)
+            size += len(data)
+
+        return batch[0] if len(batch) == 1 else b"".join(batch)
+
+    def record_sent(self, nbytes):
+        self.messages_sent += 1
+        self.bytes_sent += nbytes
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        return {
+            "depth": self.qsize() + (1 if self._carry is not None else 0),
+            "max_frames": self.maxsize,
+            "frames_enqueued": self.frames_enqueued,
+            "frames_dropped": self.frames_dropped,
+            "messages_sent": self.messages_sent,
+            "bytes_sent": self.bytes_sent,
+            "send_rate_messages_per_sec": round(self.messages_sent / elapsed, 2),
+            "send_rate_bytes_per_sec": round(self.bytes_sent / elapsed, 2),
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import struct
+import time
+from collections import namedtuple
+from common.config import AUDIO_STREAM
+
+# One streamed piece of an audio file: bytes ready to send, their format
+# ("pcm" = linear16, or "mp3" = whole MP3 frames), sample rate and duration
+AudioChunk = namedtuple("AudioChunk", ["data", "format", "sample_rate", "duration"])
+
+# MPEG audio Layer III tables, indexed by the frame header fields
+MP3_BITRATES_KBPS = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),  # MPEG-1
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),  # MPEG-2 / 2.5
+}
+MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),  # MPEG-2.5
+}
+
+
+def parse_wav(buffer):
+    """
+    Locate the PCM data of a WAV file held in a buffer (bytes or mmap).
+    Returns (data_offset, data_length, sample_rate, channels, sample_width);
+    raises ValueError if it is not uncompressed PCM.
+    """
+    if len(buffer) < 12 or buffer[0:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+    fmt = None
+    position = 12
+    while position + 8 <= len(buffer):
+        chunk_id = buffer[position : position + 4]
+        (chunk_size,) = struct.unpack("<I", buffer[position + 4 : position + 8])
+        body = position + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack("<HHIIHH", buffer[body : body + 16])
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            audio_format, channels, sample_rate, _, _, bits = fmt
+            if audio_format != 1:
+                raise ValueError("Compressed WAV not supported")
+            length = min(chunk_size, len(buffer) - body)
+            return body, length, sample_rate, channels, bits // 8
+        position = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def iter_mp3_frames(buffer):
+    """Yield (offset, length, samples, sample_rate) for each MPEG Layer III frame."""
+    position = 0
+    if buffer[0:3] == b"ID3" and len(buffer) >= 10:
+        # ID3v2 tag size is a 28-bit syncsafe integer
+        size = (buffer[6] << 21) | (buffer[7] << 14) | (buffer[8] << 7) | buffer[9]
+        position = 10 + size
+    end = len(buffer)
+    while position + 4 <= end:
+        b1, b2 = buffer[position + 1], buffer[position + 2]
+        if buffer[position] != 0xFF or (b1 & 0xE0) != 0xE0:
+            position += 1  # resync
+            continue
+        version = (b1 >> 3) & 0x3
+        layer = (b1 >> 1) & 0x3
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x3
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            position += 1  # reserved values or not Layer III
+            continue
+        bitrate = MP3_BITRATES_KBPS[1 if version == 3 else 2][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        padding = (b2 >> 1) & 0x1
+        samples = 1152 if version == 3 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+        if position + length > end:
+            return
+        yield position, length, samples, sample_rate
+        position += length
+
+
+def pcm_chunks(buffer, sample_rate, frame_bytes, chunk_secs, offset=0, length=None):
+    """
+    Fixed-duration AudioChunks of the raw PCM in buffer[offset:offset + length].
+    Chunks are slices of buffer, so zero-copy when buffer is a memoryview.
+    """
+    end = len(buffer) if length is None else offset + length
+    chunk_bytes = max(int(sample_rate * chunk_secs), 1) * frame_bytes
+    byte_rate = sample_rate * frame_bytes
+    for start in range(offset, end, chunk_bytes):
+        data = buffer[start : min(start + chunk_bytes, end)]
+        yield AudioChunk(data, "pcm", sample_rate, len(data) / byte_rate)
+
+
+def mp3_chunks(buffer, chunk_secs):
+    """
+    AudioChunks of whole MP3 frames, each about chunk_secs long. Frames depend
+    on the ones before them, so the chunks must be fed to one decoder in order.
+    """
+    start = None
+    end = 0
+    duration = 0.0
+    sample_rate = 0
+    for offset, length, samples, sample_rate in iter_mp3_frames(buffer):
+        if start is None:
+            start = offset
+        end = offset + length
+        duration += samples / sample_rate
+        if duration >= chunk_secs:
+            yield AudioChunk(buffer[start:end], "mp3", sample_rate, duration)
+            start, duration = None, 0.0
+    if start is not None:
+        yield AudioChunk(buffer[start:end], "mp3", sample_rate, duration)
+
+
+async def paced(chunks, lead_secs=None):
+    """
+    Re-yield AudioChunks no faster than real time, running at most lead_secs
+    ahead of the playback clock. The first lead_secs of audio goes out at once.
+    """
+    lead_secs = AUDIO_STREAM["lead_secs"] if lead_secs is None else lead_secs
+    start = time.monotonic()
+    sent_secs = 0.0
+    for chunk in chunks:
+        ahead = sent_secs - (time.monotonic() - start)
+        if ahead > lead_secs:
+            await asyncio.sleep(ahead - lead_secs)
+        yield chunk
+        sent_secs += chunk.duration
+
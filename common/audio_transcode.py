@@ -0,0 +1,110 @@
+"""
+Transcode compressed audio assets (MP3) to mono linear16 WAV at the agent
+audio sample rate, once, with ffmpeg.
+
+Results are kept in an on-disk cache keyed by a hash of the source file's
+content, so a recording is decoded at most once per content version, across
+restarts and workers. ffmpeg is optional: without it transcode_to_wav()
+returns None and callers fall back to the compressed audio.
+
+Warm the cache ahead of deployment from the repository root:
+    python -m common.audio_transcode common/doha_1.mp3 common/doha_2.mp3
+"""
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from common.config import AUDIO_TRANSCODE
+
+logger = logging.getLogger(__name__)
+
+_warned_missing = False
+
+
+def find_ffmpeg():
+    return shutil.which(AUDIO_TRANSCODE["ffmpeg"])
+
+
+def content_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def cache_path(path, sample_rate):
+    """Cached WAV for path's current content at sample_rate."""
+    return os.path.abspath(
+        os.path.join(AUDIO_TRANSCODE["cache_dir"], f"{content_hash(path)}_{sample_rate}.wav")
+    )
+
+
+def transcode_to_wav(path, sample_rate=None):
+    """
+    Path of a mono 16-bit PCM WAV at sample_rate with path's audio, transcoding
+    it on a cache miss. Returns None if transcoding is disabled or ffmpeg is
+    not installed; raises ValueError if ffmpeg fails on the file.
+    """
+    global _warned_missing
+    if not AUDIO_TRANSCODE["enabled"]:
+        return None
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        if not _warned_missing:
+            _warned_missing = True
+            logger.warning("ffmpeg not found; MP3 audio will be sent to the browser undecoded")
+        return None
+
+    sample_rate = sample_rate or AUDIO_TRANSCODE["sample_rate"]
+    target = cache_path(path, sample_rate)
+    if os.path.isfile(target):
+        return target
+
+    os.makedirs(AUDIO_TRANSCODE["cache_dir"], exist_ok=True)
+    # Write to a temporary file and rename, so a concurrent reader never sees a partial WAV
+    fd, partial = tempfile.mkstemp(suffix=".wav", dir=AUDIO_TRANSCODE["cache_dir"])
+    os.close(fd)
+    command = [
+        ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", path,
+        "-vn", "-map_metadata", "-1",
+        "-ac", "1", "-ar", str(sample_rate), "-acodec", "pcm_s16le",
+        "-f", "wav", partial,
+    ]
+    try:
+        completed = subprocess.run(
+            command, capture_output=True, timeout=AUDIO_TRANSCODE["timeout"]
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.decode(errors="replace").strip()
+            raise ValueError(f"ffmpeg failed: {error or completed.returncode}")
+        os.replace(partial, target)
+    except subprocess.TimeoutExpired:
+        raise ValueError("ffmpeg timed out")
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="audio files to transcode")
+    parser.add_argument("--sample-rate", type=int, default=None)
+    args = parser.parse_args()
+    for path in args.paths:
+        try:
+            target = transcode_to_wav(path, args.sample_rate)
+        except ValueError as e:
+            print(f"{path}: {e}")
+            continue
+        if target is None:
+            print("Transcoding unavailable (disabled or ffmpeg not found)")
+            return 1
+        print(f"{path} -> {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
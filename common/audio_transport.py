@@ -0,0 +1,77 @@
+import struct
+
+# Binary agent audio packets sent to the browser as Socket.IO binary attachments.
+#
+# Each "audio_packet" event carries one bytes payload: a fixed 8-byte
+# little-endian header followed by linear16 mono PCM.
+#   u8  version
+#   u8  flags (AUDIO_PACKET_FLAG_*)
+#   u16 reserved
+#   u32 sequence number
+# Sample rate, encoding and header size are sent once per session in an
+# "audio_format" event instead of with every chunk.
+AUDIO_PACKET_VERSION = 1
+AUDIO_PACKET_HEADER = struct.Struct("<BBHI")
+AUDIO_PACKET_FLAG_END = 0x01  # last packet of an utterance (partial packet)
+
+
+def audio_format_message(sample_rate, packet_secs):
+    """Payload for the one-time "audio_format" event."""
+    return {
+        "version": AUDIO_PACKET_VERSION,
+        "encoding": "linear16",
+        "channels": 1,
+        "sampleRate": sample_rate,
+        "packetMs": round(packet_secs * 1000),
+        "headerBytes": AUDIO_PACKET_HEADER.size,
+    }
+
+
+def pack_audio_packet(seq, pcm, flags=0):
+    return AUDIO_PACKET_HEADER.pack(AUDIO_PACKET_VERSION, flags, 0, seq & 0xFFFFFFFF) + pcm
+
+
+class AudioPacketizer:
+    """
+    Batches arbitrarily sized PCM chunks into packets of a fixed duration.
+
+    push() returns every complete packet now available; flush() returns the
+    remainder (if any) once the source goes idle so utterance tails are not held.
+    Packets always hold whole samples: a trailing partial sample is kept for the
+    next push(), since the browser cannot read an odd-length Int16 payload.
+    """
+
+    def __init__(self, sample_rate, packet_secs, sample_width=2):
+        self.sample_width = sample_width
+        # Keep packets aligned to whole samples
+        self.packet_bytes = max(
+            sample_width, int(sample_rate * packet_secs) * sample_width
+        )
+        self._buffer = bytearray()
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def push(self, data):
+        self._buffer += data
+        count = len(self._buffer) // self.packet_bytes
+        if not count:
+            return []
+        end = count * self.packet_bytes
+        packets = [
+            bytes(self._buffer[i : i + self.packet_bytes])
+            for i in range(0, end, self.packet_bytes)
+        ]
+        del self._buffer[:end]
+        return packets
+
+    def flush(self):
+        end = len(self._buffer) - len(self._buffer) % self.sample_width
+        if not end:
+            return None
+        packet = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return packet
+
+    def clear(self):
+        self._buffer.clear()
@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime, timedelta
+from common.data_store import parse_date
+
+HOURS_PER_DAY = 24
+
+
+def _hour_mask(start_hour, end_hour):
+    """Bitmask with bits start_hour .. end_hour - 1 set."""
+    start_hour = max(start_hour, 0)
+    end_hour = min(end_hour, HOURS_PER_DAY)
+    if end_hour <= start_hour:
+        return 0
+    return ((1 << (end_hour - start_hour)) - 1) << start_hour
+
+
+def _ceil_to_hour(value):
+    floored = value.replace(minute=0, second=0, microsecond=0)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+class SlotAvailability:
+    """
+    Hourly appointment slots kept as one 24-bit mask of booked hours per day.
+
+    An appointment at any time within an hour takes that hour's slot. Range
+    queries walk the days in the range and emit the open, unbooked bits, so
+    the cost grows with the number of days and slots returned, not with the
+    number of appointments. business_hours maps a service to its (open, close)
+    hours, with "default" used for any other service.
+    """
+
+    def __init__(self, business_hours):
+        self._open_masks = {
+            service: _hour_mask(*hours) for service, hours in business_hours.items()
+        }
+        self._booked = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dates(cls, dates, business_hours):
+        availability = cls(business_hours)
+        for value in dates:
+            availability.book(value)
+        return availability
+
+    def _open_mask(self, service):
+        return self._open_masks.get(service, self._open_masks["default"])
+
+    def book(self, value):
+        """Mark the slot containing value (a datetime or ISO string) as booked."""
+        when = parse_date(value) if isinstance(value, str) else value
+        if when is None:
+            return
+        with self._lock:
+            day = when.date()
+            self._booked[day] = self._booked.get(day, 0) | (1 << when.hour)
+
+    def reserve(self, value, service=None):
+        """
+        Atomically check that the slot containing value is open for service and
+        unbooked, and book it. Returns False if it was not available.
+        """
+        when = parse_date(value) if isinstance(value, str) else value
+        if when is None:
+            return False
+        bit = 1 << when.hour
+        if not self._open_mask(service) & bit:
+            return False
+        day = when.date()
+        with self._lock:
+            booked = self._booked.get(day, 0)
+            if booked & bit:
+                return False
+            self._booked[day] = booked | bit
+        return True
+
+    def release(self, value):
+        """Undo a reserve(), e.g. when the store rejected the booking."""
+        when = parse_date(value) if isinstance(value, str) else value
+        if when is None:
+            return
+        day = when.date()
+        with self._lock:
+            booked = self._booked.get(day, 0) & ~(1 << when.hour)
+            if booked:
+                self._booked[day] = booked
+            else:
+                self._booked.pop(day, None)
+
+    def available_slots(self, start, end, service=None):
+        """Open, unbooked slot start times (datetimes) within [start, end]."""
+        start = _ceil_to_hour(start)
+        if end < start:
+            return []
+        open_mask = self._open_mask(service)
+        slots = []
+        day = start.date()
+        last_day = end.date()
+        with self._lock:
+            while day <= last_day:
+                mask = open_mask & ~self._booked.get(day, 0)
+                if day == start.date():
+                    mask &= _hour_mask(start.hour, HOURS_PER_DAY)
+                if day == last_day:
+                    mask &= _hour_mask(0, end.hour + 1)
+                midnight = datetime(day.year, day.month, day.day)
+                while mask:
+                    low_bit = mask & -mask
+                    slots.append(midnight + timedelta(hours=low_bit.bit_length() - 1))
+                    mask ^= low_bit
+                day += timedelta(days=1)
+        return slots
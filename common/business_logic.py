@@ -2,7 +2,17 @@ import asyncio
 import json
 from datetime import datetime, timedelta
 import random
-from common.config import ARTIFICIAL_DELAY, MOCK_DATA_SIZE
+import threading
+from common.config import (
+    ARTIFICIAL_DELAY,
+    MOCK_DATA_SIZE,
+    MOCK_DATA_SETTINGS,
+    DATABASE_CONFIG,
+    BUSINESS_HOURS,
+)
+from common.availability import SlotAvailability
+from common.data_store import MockDataStore, parse_date
+from common.sqlite_store import SQLiteDataStore
 import pathlib
 
 
@@ -86,6 +96,16 @@ def generate_mock_data():
     # Format sample data for display
     sample_data = []
     sample_customers = random.sample(customers, 3)
+    # Group only the sample customers' records, in one pass over each list
+    sample_appointments = {customer["id"]: [] for customer in sample_customers}
+    for apt in appointments:
+        if apt["customer_id"] in sample_appointments:
+            sample_appointments[apt["customer_id"]].append(apt)
+    sample_orders = {customer["id"]: [] for customer in sample_customers}
+    for order in orders:
+        if order["customer_id"] in sample_orders:
+            sample_orders[order["customer_id"]].append(order)
+
     for customer in sample_customers:
         customer_data = {
             "Customer": customer["name"],
@@ -97,10 +117,7 @@ def generate_mock_data():
         }
 
         # Add appointments
-        customer_appointments = [
-            a for a in appointments if a["customer_id"] == customer["id"]
-        ]
-        for apt in customer_appointments[:2]:
+        for apt in sample_appointments[customer["id"]][:2]:
             customer_data["Appointments"].append(
                 {
                     "Service": apt["service"],
@@ -110,8 +127,7 @@ def generate_mock_data():
             )
 
         # Add orders
-        customer_orders = [o for o in orders if o["customer_id"] == customer["id"]]
-        for order in customer_orders[:2]:
+        for order in sample_orders[customer["id"]][:2]:
             customer_data["Orders"].append(
                 {
                     "ID": order["id"],
@@ -133,13 +149,95 @@ def generate_mock_data():
     }
 
     # Save the mock data
-    save_mock_data(mock_data)
+    if MOCK_DATA_SETTINGS["save_output"]:
+        save_mock_data(mock_data)
 
     return mock_data
 
 
-# Initialize mock data
-MOCK_DATA = generate_mock_data()
+def load_mock_data():
+    """Load mock data from the snapshot file if configured, otherwise generate it."""
+    snapshot = MOCK_DATA_SETTINGS["snapshot_path"]
+    if snapshot:
+        snapshot_path = pathlib.Path(snapshot)
+        if snapshot_path.exists():
+            with open(snapshot_path) as f:
+                return json.load(f)
+    data = generate_mock_data()
+    if snapshot:
+        with open(snapshot_path, "w") as f:
+            json.dump(data, f)
+        print(f"\nMock data snapshot saved to: {snapshot_path}")
+    return data
+
+
+def create_store(data):
+    """Build the data store selected by DATABASE_CONFIG."""
+    if not DATABASE_CONFIG["enable"]:
+        return MockDataStore(data)
+    store = SQLiteDataStore(DATABASE_CONFIG["path"], DATABASE_CONFIG["pool_size"])
+    if store.is_empty():
+        store.load(data)
+        print(f"Loaded mock data into {DATABASE_CONFIG['path']}")
+    return store
+
+
+# Mock data and the store over it are built on first access rather than at import,
+# so importing this module (and starting each worker) stays cheap
+_mock_data = None
+_store = None
+_availability = None
+_init_lock = threading.Lock()
+
+
+def get_mock_data():
+    global _mock_data
+    if _mock_data is None:
+        with _init_lock:
+            if _mock_data is None:
+                _mock_data = load_mock_data()
+    return _mock_data
+
+
+def get_store():
+    """Store used by all lookups: an indexed view over the mock data, or SQLite if enabled."""
+    global _store
+    if _store is None:
+        data = get_mock_data()
+        with _init_lock:
+            if _store is None:
+                _store = create_store(data)
+    return _store
+
+
+def get_availability():
+    """Booked-slot index over the store's appointments, kept current by schedule_appointment."""
+    global _availability
+    if _availability is None:
+        store = get_store()
+        with _init_lock:
+            if _availability is None:
+                _availability = SlotAvailability.from_dates(
+                    store.appointment_dates(), BUSINESS_HOURS
+                )
+    return _availability
+
+
+async def load_store():
+    """
+    get_store() for coroutines. The first build (data generation, SQLite bulk
+    load) runs on a worker thread so it does not stall the shared event loop.
+    """
+    if _store is None:
+        return await asyncio.to_thread(get_store)
+    return _store
+
+
+async def load_availability():
+    """get_availability() for coroutines; the first build scans every appointment, off the loop."""
+    if _availability is None:
+        return await asyncio.to_thread(get_availability)
+    return _availability
 
 
 async def simulate_delay(delay_type):
@@ -151,21 +249,14 @@ async def get_customer(phone=None, email=None, customer_id=None):
     """Look up a customer by phone, email, or ID."""
     await simulate_delay("database")
 
-    if phone:
-        customer = next(
-            (c for c in MOCK_DATA["customers"] if c["phone"] == phone), None
-        )
-    elif email:
-        customer = next(
-            (c for c in MOCK_DATA["customers"] if c["email"] == email), None
-        )
-    elif customer_id:
-        customer = next(
-            (c for c in MOCK_DATA["customers"] if c["id"] == customer_id), None
-        )
-    else:
+    if not (phone or email or customer_id):
         return {"error": "No search criteria provided"}
 
+    store = await load_store()
+    customer = await store.call(
+        store.get_customer, phone=phone, email=email, customer_id=customer_id
+    )
+
     return customer if customer else {"error": "Customer not found"}
 
 
@@ -173,9 +264,8 @@ async def get_customer_appointments(customer_id):
     """Get all appointments for a customer."""
     await simulate_delay("database")
 
-    appointments = [
-        a for a in MOCK_DATA["appointments"] if a["customer_id"] == customer_id
-    ]
+    store = await load_store()
+    appointments = await store.call(store.get_customer_appointments, customer_id)
     return {"customer_id": customer_id, "appointments": appointments}
 
 
@@ -183,23 +273,39 @@ async def get_customer_orders(customer_id):
     """Get all orders for a customer."""
     await simulate_delay("database")
 
-    orders = [o for o in MOCK_DATA["orders"] if o["customer_id"] == customer_id]
+    store = await load_store()
+    orders = await store.call(store.get_customer_orders, customer_id)
     return {"customer_id": customer_id, "orders": orders}
 
 
 async def schedule_appointment(customer_id, date, service):
-    """Schedule a new appointment."""
+    """
+    Schedule a new appointment.
+
+    Booking is atomic across concurrent sessions: the slot is reserved in the
+    availability index without yielding to the event loop, the ID comes from
+    the store's monotonic allocator, and the store re-checks the slot when it
+    inserts.
+    """
     await simulate_delay("database")
 
+    when = parse_date(date)
+    if when is None:
+        return {"error": "Date must be in ISO format"}
+
     # Verify customer exists
     customer = await get_customer(customer_id=customer_id)
     if "error" in customer:
         return customer
 
-    # Create new appointment
-    appointment_id = f"APT{len(MOCK_DATA['appointments']):04d}"
+    availability = await load_availability()
+    if not availability.reserve(when, service):
+        return {"error": "Slot not available", "date": date, "service": service}
+
+    # Create new appointment; the SQLite allocator scans existing IDs on first use
+    store = await load_store()
     appointment = {
-        "id": appointment_id,
+        "id": await store.call(store.allocate_appointment_id),
         "customer_id": customer_id,
         "customer_name": customer["name"],
         "date": date,
@@ -207,31 +313,40 @@ async def schedule_appointment(customer_id, date, service):
         "status": "Scheduled",
     }
 
-    MOCK_DATA["appointments"].append(appointment)
+    try:
+        added = await store.call(store.add_appointment, appointment)
+    except Exception:
+        availability.release(when)
+        raise
+    if added is None:
+        # Taken by a booking the availability index has not seen (e.g. another process)
+        return {"error": "Slot not available", "date": date, "service": service}
     return appointment
 
 
-async def get_available_appointment_slots(start_date, end_date):
-    """Get available appointment slots."""
+async def get_available_appointment_slots(start_date, end_date, service=None):
+    """Get available one-hour appointment slots, within the service's business hours."""
     await simulate_delay("database")
 
-    # Convert dates to datetime objects
-    start = datetime.fromisoformat(start_date)
-    end = datetime.fromisoformat(end_date)
+    start = parse_date(start_date)
+    end = parse_date(end_date)
+    if start is None or end is None:
+        return {"error": "Dates must be in ISO format"}
+
+    slots = (await load_availability()).available_slots(start, end, service)
+    return {"available_slots": [slot.isoformat() for slot in slots]}
 
-    # Generate available slots (9 AM to 5 PM, 1-hour slots)
-    slots = []
-    current = start
-    while current <= end:
-        if current.hour >= 9 and current.hour < 17:
-            slot_time = current.isoformat()
-            # Check if slot is already taken
-            taken = any(a["date"] == slot_time for a in MOCK_DATA["appointments"])
-            if not taken:
-                slots.append(slot_time)
-        current += timedelta(hours=1)
 
-    return {"available_slots": slots}
+# Fixed agent utterances; also pre-rendered to audio by common/tts_cache.py
+FILLER_MESSAGES = {
+    "lookup": "Let me look that up for you...",
+    "general": "One moment please...",
+}
+FAREWELL_MESSAGES = {
+    "thanks": "Thank you for calling! Have a great day!",
+    "help": "I'm glad I could help! Have a wonderful day!",
+    "general": "Goodbye! Have a nice day!",
+}
 
 
 async def prepare_agent_filler_message(websocket, message_type):
@@ -243,16 +358,10 @@ async def prepare_agent_filler_message(websocket, message_type):
     result = {"status": "queued", "message_type": message_type}
 
     # Prepare the inject message but don't send it yet
-    if message_type == "lookup":
-        inject_message = {
-            "type": "InjectAgentMessage",
-            "message": "Let me look that up for you...",
-        }
-    else:
-        inject_message = {
-            "type": "InjectAgentMessage",
-            "message": "One moment please...",
-        }
+    inject_message = {
+        "type": "InjectAgentMessage",
+        "message": FILLER_MESSAGES.get(message_type, FILLER_MESSAGES["general"]),
+    }
 
     # Return the result first - this becomes the function call response
     # The caller can then send the inject message after handling the function response
@@ -262,12 +371,7 @@ async def prepare_agent_filler_message(websocket, message_type):
 async def prepare_farewell_message(websocket, farewell_type):
     """End the conversation with an appropriate farewell message and close the connection."""
     # Prepare farewell message based on type
-    if farewell_type == "thanks":
-        message = "Thank you for calling! Have a great day!"
-    elif farewell_type == "help":
-        message = "I'm glad I could help! Have a wonderful day!"
-    else:  # general
-        message = "Goodbye! Have a nice day!"
+    message = FAREWELL_MESSAGES.get(farewell_type, FAREWELL_MESSAGES["general"])
 
     # Prepare messages but don't send them
     inject_message = {"type": "InjectAgentMessage", "message": message}
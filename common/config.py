@@ -12,9 +12,130 @@ MOCK_DATA_SIZE = {
     "orders": 2000
 }
 
+# Mock data is generated on first use, not at import
+# save_output: also write each generated dataset to mock_data_outputs/ for inspection
+# snapshot_path: JSON file to load the dataset from; generated and written there if it does not exist
+MOCK_DATA_SETTINGS = {
+    "save_output": False,
+    "snapshot_path": None
+}
+
 # Database settings (if using SQLite)
-# Not in use in this reference implementation but left as an example for how to potentially integrate with a DB
+# When enabled, business functions query a SQLite database (WAL mode) instead of the in-memory store.
+# An empty database is bulk loaded with the generated mock data on startup.
+# pool_size: connections (and worker threads) used to run queries off the event loop
 DATABASE_CONFIG = {
     "path": "business_data.db",
-    "enable": False  # Set to True to use actual SQLite instead of mock data
-} 
\ No newline at end of file
+    "enable": False,  # Set to True to use actual SQLite instead of mock data
+    "pool_size": 4
+}
+
+# Streaming of recorded audio assets (e.g. Hanuman Chalisa verses) to the browser
+# Files are sent in chunk_secs pieces paced to real time, running at most lead_secs ahead of playback
+AUDIO_STREAM = {
+    "chunk_secs": 0.1,
+    "lead_secs": 0.5
+}
+
+# Shared in-memory cache of recorded audio assets (see common/audio_assets.py)
+# Assets are validated (headers only) at import; their audio (WAV as raw PCM, MP3 as frames) is held once per process
+# and shared read-only by all sessions. budget_bytes: resident audio bytes, least recently used evicted first
+# preload: transcode and load assets into the cache in the background when the server starts (up to the budget)
+# instead of on first playback
+AUDIO_ASSET_CACHE = {
+    "budget_bytes": 64 * 1024 * 1024,
+    "preload": True
+}
+
+# Server-side transcoding of MP3 audio assets to mono linear16 WAV (see common/audio_transcode.py)
+# Needs ffmpeg on PATH (or set "ffmpeg" to its path); without it MP3 frames are sent for the browser to decode.
+# sample_rate: keep equal to AGENT_AUDIO_SAMPLE_RATE so verse audio takes the same PCM path as agent speech
+# cache_dir: transcoded files, named by a hash of the source content; timeout: seconds per ffmpeg run
+AUDIO_TRANSCODE = {
+    "enabled": True,
+    "ffmpeg": "ffmpeg",
+    "sample_rate": 16000,
+    "cache_dir": "audio_cache",
+    "timeout": 60
+}
+
+# Hanuman Chalisa lesson sequencing (common/sequencer.py)
+# tts_timeout: seconds to wait for a TTS inject or for the preface to finish playing; playback_timeout_margin: seconds past the verse duration to wait
+# for the browser's playback ack; advance_timeout: seconds to wait for the learner to move on to the next step
+CHALISA_SEQUENCER = {
+    "tts_timeout": 5.0,
+    "playback_timeout_margin": 3.0,
+    "advance_timeout": 120.0
+}
+
+# Function calls requested by the agent
+# Each function runs as its own task, off the websocket receive loop, with its own timeout (seconds)
+# and its own FunctionCallResponse (an error result on failure or timeout)
+# max_concurrent: function calls running at once per session; further calls wait for a slot
+# thread_pool_size: threads shared by all sessions for plain (non-async) functions in FUNCTION_MAP
+FUNCTION_CALLS = {
+    "timeout": 10.0,
+    "max_concurrent": 4,
+    "thread_pool_size": 8
+}
+
+# Cache for function call results; per-function policies (TTL, size, key) live next to FUNCTION_MAP
+# default_max_entries: LRU bound for policies that do not set their own
+FUNCTION_CACHE_SETTINGS = {
+    "enabled": True,
+    "default_max_entries": 256
+}
+
+# Pre-rendered audio for the agent's fixed utterances (filler, farewells, greetings, Chalisa preface)
+# Rendered offline with `python -m common.tts_cache` into directory; utterances not found there use agent TTS
+# use_stub_audio: also play audio rendered by the stub synthesizer (--stub), for testing only
+TTS_CACHE_SETTINGS = {
+    "enabled": True,
+    "directory": "tts_cache",
+    "use_stub_audio": False
+}
+
+# Appointment slot hours per service as (open, close) hours, close exclusive; one-hour slots
+# "default" applies to any service not listed
+BUSINESS_HOURS = {
+    "default": (9, 17),
+    "Consultation": (9, 17),
+    "Follow-up": (9, 17),
+    "Review": (10, 16),
+    "Planning": (13, 17)
+}
+
+# Voice agent session settings
+# Upper bound on concurrent voice agent sessions per worker process (admission control)
+SESSION_LIMITS = {
+    "max_sessions": 200
+}
+
+# Shared asyncio event loops hosting all voice agent sessions
+# size: number of loops (each on its own thread); pin_cores: pin loop threads to CPU cores (Linux only)
+EVENT_LOOP_POOL = {
+    "size": 1,
+    "pin_cores": False
+}
+
+# Microphone audio queue between capture (PortAudio / Socket.IO) and the Deepgram sender
+# max_frames: bound on queued frames; the oldest frame is dropped when full
+# coalesce_max_secs: queued frames are merged into one websocket message up to this much 16-bit mono audio
+# at the session's negotiated input sample rate
+# coalesce_window: seconds the sender may wait for more frames before sending (0 = send what is queued)
+MIC_AUDIO_QUEUE = {
+    "max_frames": 100,
+    "coalesce_max_secs": 0.1,
+    "coalesce_window": 0.0
+}
+
+# Jitter buffer for agent audio sent to the browser
+# Audio is re-chunked into packet_secs packets and paced by wall clock, running lead_secs ahead
+# of real time. Playback starts once prebuffer_secs is buffered; idle_secs without new audio ends an utterance.
+JITTER_BUFFER = {
+    "enabled": True,
+    "packet_secs": 0.02,
+    "prebuffer_secs": 0.06,
+    "lead_secs": 0.1,
+    "idle_secs": 0.08
+}
@@ -0,0 +1,159 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+
+def parse_date(value):
+    """Parse an ISO date string to a naive datetime, or None if it is not ISO formatted."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed.replace(tzinfo=None)
+
+
+def slot_bounds(value):
+    """[start, end) of the one-hour appointment slot containing a datetime."""
+    start = value.replace(minute=0, second=0, microsecond=0)
+    return start, start + timedelta(hours=1)
+
+
+def next_sequence(ids, prefix):
+    """One past the highest numeric suffix among ids like APT0042 (0 if there are none)."""
+    pattern = re.compile(re.escape(prefix) + r"(\d+)$")
+    highest = -1
+    for value in ids:
+        match = pattern.match(value)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+
+class AppointmentIdAllocator:
+    """Hands out APT IDs from a monotonic counter; safe across threads and coroutines."""
+
+    def __init__(self, start):
+        self._next = start
+        self._lock = threading.Lock()
+
+    def allocate(self):
+        with self._lock:
+            value = self._next
+            self._next += 1
+        return f"APT{value:04d}"
+
+
+class MockDataStore:
+    """
+    In-memory store over the mock data lists with indexes for every lookup
+    the business functions make.
+
+    - hash indexes on customer phone, email and id
+    - customer_id -> appointments and customer_id -> orders
+    - appointments sorted by date, so a date range is a bisect instead of a scan
+
+    The store shares the record lists in the mock data dict; add_appointment()
+    appends to them and updates every index incrementally. Writes are
+    optimistic: add_appointment() re-checks the slot under the store lock at
+    insert time and rejects the write if the slot was taken meanwhile.
+    """
+
+    # Lookups are pure dict/bisect operations, so they run inline on the event loop
+    blocking = False
+
+    def __init__(self, data):
+        self.customers = data["customers"]
+        self.appointments = data["appointments"]
+        self.orders = data["orders"]
+
+        self._customers_by_id = {}
+        self._customers_by_phone = {}
+        self._customers_by_email = {}
+        for customer in self.customers:
+            self._index_customer(customer)
+
+        self._orders_by_customer = defaultdict(list)
+        for order in self.orders:
+            self._orders_by_customer[order["customer_id"]].append(order)
+
+        self._appointments_by_customer = defaultdict(list)
+        dated = []
+        for appointment in self.appointments:
+            self._appointments_by_customer[appointment["customer_id"]].append(appointment)
+            date = parse_date(appointment["date"])
+            if date is not None:
+                dated.append((date, appointment))
+        dated.sort(key=lambda pair: pair[0])
+        # Parallel sorted lists: dates for bisect, appointments for the results
+        self._appointment_dates = [date for date, _ in dated]
+        self._appointments_by_date = [appointment for _, appointment in dated]
+
+        self._lock = threading.Lock()
+        self._ids = AppointmentIdAllocator(
+            next_sequence((a["id"] for a in self.appointments), "APT")
+        )
+
+    async def call(self, fn, *args, **kwargs):
+        """Run a store method; same interface as SQLiteDataStore.call()."""
+        return fn(*args, **kwargs)
+
+    def _index_customer(self, customer):
+        self._customers_by_id[customer["id"]] = customer
+        self._customers_by_phone[customer["phone"]] = customer
+        self._customers_by_email[customer["email"]] = customer
+
+    def get_customer(self, phone=None, email=None, customer_id=None):
+        if phone:
+            return self._customers_by_phone.get(phone)
+        if email:
+            return self._customers_by_email.get(email)
+        if customer_id:
+            return self._customers_by_id.get(customer_id)
+        return None
+
+    def get_customer_appointments(self, customer_id):
+        return list(self._appointments_by_customer.get(customer_id, ()))
+
+    def get_customer_orders(self, customer_id):
+        return list(self._orders_by_customer.get(customer_id, ()))
+
+    def appointments_between(self, start, end):
+        """Appointments whose date falls within [start, end] (datetimes)."""
+        with self._lock:
+            lo = bisect.bisect_left(self._appointment_dates, start)
+            hi = bisect.bisect_right(self._appointment_dates, end)
+            return self._appointments_by_date[lo:hi]
+
+    def appointment_dates(self):
+        return [appointment["date"] for appointment in self.appointments]
+
+    def allocate_appointment_id(self):
+        return self._ids.allocate()
+
+    def add_appointment(self, appointment):
+        """
+        Insert an appointment unless another one already occupies its hour slot.
+        Returns the appointment, or None if the slot was taken.
+        """
+        date = parse_date(appointment["date"])
+        with self._lock:
+            if date is not None:
+                slot_start, slot_end = slot_bounds(date)
+                index = bisect.bisect_left(self._appointment_dates, slot_start)
+                if (
+                    index < len(self._appointment_dates)
+                    and self._appointment_dates[index] < slot_end
+                ):
+                    return None
+            self.appointments.append(appointment)
+            self._appointments_by_customer[appointment["customer_id"]].append(appointment)
+            if date is not None:
+                index = bisect.bisect_right(self._appointment_dates, date)
+                self._appointment_dates.insert(index, date)
+                self._appointments_by_date.insert(index, appointment)
+        return appointment
+
+    def appointment_count(self):
+        return len(self.appointments)
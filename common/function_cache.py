@@ -0,0 +1,180 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from common.config import FUNCTION_CACHE_SETTINGS
+from common.metrics import METRICS
+
+CACHE_REQUESTS = METRICS.counter(
+    "voice_agent_function_cache_requests_total",
+    "Function call results served from the cache (hit) or computed (miss)",
+)
+CACHE_INVALIDATIONS = METRICS.counter(
+    "voice_agent_function_cache_invalidations_total",
+    "Cached function results dropped by an invalidation hook",
+)
+
+
+class EncodedResult:
+    """
+    Immutable function result with its JSON encoding done once, for results
+    that are built ahead of time. Functions may return one instead of a dict.
+    """
+
+    __slots__ = ("value", "content")
+
+    def __init__(self, value):
+        self.value = MappingProxyType(dict(value))
+        self.content = json.dumps(value)
+
+
+def encode_result(result):
+    """FunctionCallResponse content for a function result."""
+    if isinstance(result, EncodedResult):
+        return result.content
+    return json.dumps(result)
+
+
+class CachePolicy:
+    """
+    How one function's results are cached.
+
+    - ttl: seconds an entry stays valid (None = until evicted or invalidated)
+    - max_entries: LRU bound on entries for this function
+    - key_params: parameters that make up the key (default: all of them)
+    - case_insensitive: string parameters the function lowercases, so the key ignores their case
+    - tags: callable(params) -> tags attached to an entry, for invalidate(tag=...)
+    """
+
+    def __init__(
+        self,
+        ttl=None,
+        max_entries=None,
+        key_params=None,
+        case_insensitive=(),
+        tags=None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries or FUNCTION_CACHE_SETTINGS["default_max_entries"]
+        self.key_params = key_params
+        self.case_insensitive = set(case_insensitive)
+        self.tags = tags
+
+    def key(self, params):
+        """
+        Key for a call's parameters. It normalizes only what the functions
+        themselves ignore, so two calls share an entry only if they would
+        compute the same result: None is the same as omitted, and the
+        case_insensitive parameters (which the function lowercases) ignore case.
+        """
+        normalized = {}
+        for name, value in params.items():
+            if self.key_params is not None and name not in self.key_params:
+                continue
+            if value is None:
+                continue
+            if isinstance(value, str) and name in self.case_insensitive:
+                value = value.lower()
+            normalized[name] = value
+        return json.dumps(normalized, sort_keys=True)
+
+
+class FunctionCache:
+    """
+    Result cache for function calls, declared per function with a CachePolicy.
+
+    Results are stored already serialized, so a hit hands back the exact
+    FunctionCallResponse content string without another json.dumps. Error
+    results are never cached, and neither is a result whose function or tags
+    were invalidated while it was being computed, since it may be stale.
+    Shared by all sessions (and event loop threads).
+    """
+
+    def __init__(self):
+        self._policies = {}
+        self._entries = {}  # function name -> OrderedDict(key -> (expires_at, content, tags))
+        self._generations = {}  # function name or ("tag", tag) -> invalidate() count
+        self._lock = threading.Lock()
+
+    def register(self, name, policy):
+        with self._lock:
+            self._policies[name] = policy
+            self._entries[name] = OrderedDict()
+
+    async def call(self, name, params, compute):
+        """
+        Return the serialized result of a function call, from the cache when
+        possible. compute() is awaited on a miss (or when name has no policy).
+        """
+        policy = self._policies.get(name)
+        if policy is None or not FUNCTION_CACHE_SETTINGS["enabled"]:
+            return encode_result(await compute())
+
+        key = policy.key(params)
+        tags = frozenset(policy.tags(params)) if policy.tags else frozenset()
+        watched = [name] + [("tag", tag) for tag in tags]
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries[name]
+            entry = entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                entries.move_to_end(key)
+                CACHE_REQUESTS.inc(function=name, outcome="hit")
+                return entry[1]
+            generation = [self._generations.get(item, 0) for item in watched]
+        CACHE_REQUESTS.inc(function=name, outcome="miss")
+
+        result = await compute()
+        content = encode_result(result)
+        value = result.value if isinstance(result, EncodedResult) else result
+        if isinstance(value, dict) and "error" in value:
+            return content
+
+        expires_at = now + policy.ttl if policy.ttl is not None else None
+        with self._lock:
+            if [self._generations.get(item, 0) for item in watched] != generation:
+                # Invalidated while computing; the result may predate the change
+                return content
+            entries = self._entries[name]
+            entries[key] = (expires_at, content, tags)
+            entries.move_to_end(key)
+            while len(entries) > policy.max_entries:
+                entries.popitem(last=False)
+        return content
+
+    def invalidate(self, name=None, tag=None):
+        """
+        Drop every entry of a function, every entry carrying a tag, or both
+        filters combined. Results still being computed for them are not stored.
+        """
+        removed = 0
+        with self._lock:
+            names = [name] if name is not None else list(self._entries)
+            for item in [("tag", tag)] if tag is not None else names:
+                self._generations[item] = self._generations.get(item, 0) + 1
+            for function_name in names:
+                entries = self._entries.get(function_name)
+                if not entries:
+                    continue
+                stale = [key for key, entry in entries.items() if tag is None or tag in entry[2]]
+                for key in stale:
+                    del entries[key]
+                removed += len(stale)
+        if removed:
+            CACHE_INVALIDATIONS.inc(removed)
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {name: len(entries) for name, entries in self._entries.items()}
+
+
+# Process-wide cache; policies are registered next to FUNCTION_MAP
+FUNCTION_CACHE = FunctionCache()
+
+METRICS.gauge(
+    "voice_agent_function_cache_entries",
+    "Function call results currently cached",
+    lambda: sum(FUNCTION_CACHE.stats().values()),
+)
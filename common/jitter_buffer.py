@@ -0,0 +1,148 @@
+import threading
+import time
+from common.config import JITTER_BUFFER
+
+
+class JitterBuffer:
+    """
+    Re-chunks bursty agent audio into fixed-duration packets paced by wall clock.
+
+    Deepgram delivers TTS in irregular bursts. The buffer starts playout as soon
+    as prebuffer_secs is available, then releases one packet every packet_secs,
+    lead_secs ahead of real time so the browser always has a little audio
+    scheduled. When a packet's playout time passes (including the lead) without
+    enough audio, the clock is re-anchored instead of bursting to catch up, and
+    an underrun is counted if more audio for the same utterance then arrives.
+
+    The buffer only holds whole samples, so every packet (the flushed tail
+    included) has an even length for the browser's Int16Array; a trailing
+    partial sample waits for the next push().
+
+    push() and clear() may be called from any thread; pop_due() is called by
+    the playback thread.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        packet_secs=None,
+        prebuffer_secs=None,
+        lead_secs=None,
+        idle_secs=None,
+        sample_width=2,
+        clock=time.monotonic,
+    ):
+        self.sample_rate = sample_rate
+        self.packet_secs = packet_secs if packet_secs is not None else JITTER_BUFFER["packet_secs"]
+        self.prebuffer_secs = (
+            prebuffer_secs if prebuffer_secs is not None else JITTER_BUFFER["prebuffer_secs"]
+        )
+        self.lead_secs = lead_secs if lead_secs is not None else JITTER_BUFFER["lead_secs"]
+        self.idle_secs = idle_secs if idle_secs is not None else JITTER_BUFFER["idle_secs"]
+        self.sample_width = sample_width
+        self.bytes_per_sec = sample_rate * sample_width
+        self.packet_bytes = int(sample_rate * self.packet_secs) * sample_width
+        self.prebuffer_bytes = int(self.bytes_per_sec * self.prebuffer_secs)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._partial = b""  # trailing bytes of an incomplete sample
+        self._playing = False
+        self._play_start = 0.0
+        self._packets_out = 0  # packets released since playout started
+        self._last_push = 0.0
+        self._starving = False
+
+        self.underruns = 0
+        self.packets_sent = 0
+        self.max_depth_bytes = 0
+
+    def push(self, data):
+        with self._lock:
+            if self._partial:
+                data = self._partial + data
+            end = len(data) - len(data) % self.sample_width
+            self._partial = bytes(data[end:])
+            data = data[:end]
+            if self._starving:
+                # The client ran dry mid-utterance
+                self.underruns += 1
+                self._starving = False
+            self._buffer += data
+            self._last_push = self._clock()
+            self.max_depth_bytes = max(self.max_depth_bytes, len(self._buffer))
+
+    def clear(self):
+        """Drop everything buffered and stop playout (barge-in)."""
+        with self._lock:
+            self._buffer.clear()
+            self._partial = b""
+            self._playing = False
+            self._starving = False
+
+    def _due_time(self):
+        return self._play_start + self._packets_out * self.packet_secs - self.lead_secs
+
+    def next_due_in(self):
+        """Seconds until pop_due() may release a packet, or None if idle."""
+        with self._lock:
+            if not self._buffer:
+                return None
+            if not self._playing:
+                return 0.0 if len(self._buffer) >= self.prebuffer_bytes else self.packet_secs
+            return max(0.0, self._due_time() - self._clock())
+
+    def pop_due(self):
+        """
+        Return a list of (pcm, is_last) packets whose playout time has come.
+
+        is_last marks a partial packet flushed because the source went idle.
+        """
+        packets = []
+        with self._lock:
+            now = self._clock()
+            source_idle = now - self._last_push >= self.idle_secs
+
+            if not self._playing:
+                if not self._buffer:
+                    return packets
+                if len(self._buffer) < self.prebuffer_bytes and not source_idle:
+                    return packets
+                self._playing = True
+                self._starving = False
+                self._play_start = now
+                self._packets_out = 0
+
+            while self._playing:
+                due = self._due_time()
+                if due > now:
+                    break
+                if len(self._buffer) >= self.packet_bytes:
+                    packets.append((bytes(self._buffer[: self.packet_bytes]), False))
+                    del self._buffer[: self.packet_bytes]
+                    self._packets_out += 1
+                elif source_idle:
+                    # End of utterance: send the remainder and wait for the next one
+                    if self._buffer:
+                        packets.append((bytes(self._buffer), True))
+                        self._buffer.clear()
+                    self._playing = False
+                    self._starving = False
+                else:
+                    if now > due + self.lead_secs:
+                        # The client has played out everything we sent
+                        self._starving = True
+                        self._play_start = now + self.lead_secs - self._packets_out * self.packet_secs
+                    break
+
+            self.packets_sent += len(packets)
+        return packets
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth_ms": round(len(self._buffer) / self.bytes_per_sec * 1000, 1),
+                "max_depth_ms": round(self.max_depth_bytes / self.bytes_per_sec * 1000, 1),
+                "packets_sent": self.packets_sent,
+                "underruns": self.underruns,
+            }
@@ -1,9 +1,20 @@
+import contextvars
 import logging
 import json
 from datetime import datetime
 from flask_socketio import SocketIO
 
 
+# Socket.IO sid of the voice agent session the current code runs for. Set once in
+# VoiceAgent.run(); tasks (and the playback thread) it starts inherit it.
+SESSION_SID = contextvars.ContextVar("session_sid", default=None)
+
+
+def session_logger(logger, sid):
+    """Logger whose records go to the browser of session sid only."""
+    return logging.LoggerAdapter(logger, {"sid": sid})
+
+
 class CustomFormatter(
     logging.Formatter,
 ):
@@ -70,7 +81,12 @@ class CustomFormatter(
                 color = self.COLORS["GREEN"]
             elif any(
                 phrase in msg
-                for phrase in ["decision latency", "function execution latency"]
+                for phrase in [
+                    "decision latency",
+                    "function execution latency",
+                    "barge-in latency",
+                    "turn latency",
+                ]
             ):
                 color = self.COLORS["YELLOW"]
 
@@ -79,8 +95,10 @@ class CustomFormatter(
             color + format_str + self.COLORS["RESET"], datefmt="%H:%M:%S"
         )
         formatted_message = formatter.format(record)
-        # Emit the log message to the client with timestamp
-        if self.socketio:
+        # Emit the log message to its session's client only; records that belong
+        # to no session (startup, shared loops) stay on the console
+        sid = getattr(record, "sid", None) or SESSION_SID.get()
+        if self.socketio and sid:
             try:
                 self.socketio.emit(
                     "log_message",
@@ -88,6 +106,7 @@ class CustomFormatter(
                         "message": formatted_message,
                         "timestamp": datetime.now().isoformat(),
                     },
+                    to=sid,
                 )
             except Exception as e:
                 print(f"Error emitting log message: {e}")
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import threading
+from common.config import EVENT_LOOP_POOL
+
+
+class EventLoopPool:
+    """
+    Small fixed pool of long-lived asyncio event loops, each running on its own
+    daemon thread. Many VoiceAgent.run() coroutines share these loops instead
+    of each call creating a thread and a loop of its own.
+
+    submit() is thread-safe and can be called from Socket.IO handlers.
+    """
+
+    def __init__(self, size=None, pin_cores=None):
+        self.size = max(1, size if size is not None else EVENT_LOOP_POOL["size"])
+        self.pin_cores = (
+            pin_cores if pin_cores is not None else EVENT_LOOP_POOL["pin_cores"]
+        )
+        self._loops = []
+        self._threads = []
+        self._active = []  # number of sessions currently scheduled on each loop
+        self._lock = threading.Lock()
+
+    def _run_loop(self, loop, ready, core=None):
+        if core is not None and hasattr(os, "sched_setaffinity"):
+            try:
+                # pid 0 is the calling thread on Linux
+                os.sched_setaffinity(0, {core})
+            except OSError:
+                pass
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def start(self):
+        with self._lock:
+            if self._loops:
+                return
+            cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+            for i in range(self.size):
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                core = cores[i % len(cores)] if self.pin_cores and cores else None
+                thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(loop, ready, core),
+                    name=f"voice-agent-loop-{i}",
+                    daemon=True,
+                )
+                thread.start()
+                ready.wait()
+                self._loops.append(loop)
+                self._threads.append(thread)
+                self._active.append(0)
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the least loaded loop.
+
+        Returns (loop, concurrent.futures.Future). Cancelling the future cancels
+        the coroutine's task on its loop.
+        """
+        self.start()
+        with self._lock:
+            index = min(range(len(self._loops)), key=self._active.__getitem__)
+            self._active[index] += 1
+            loop = self._loops[index]
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        future.add_done_callback(lambda _: self._release(index))
+        return loop, future
+
+    def _release(self, index):
+        with self._lock:
+            self._active[index] -= 1
+
+    def stop(self):
+        with self._lock:
+            loops, threads = self._loops, self._threads
+            self._loops, self._threads, self._active = [], [], []
+        for loop in loops:
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in threads:
+            thread.join(timeout=5)
+        for loop in loops:
+            loop.close()
+
+    def stats(self):
+        with self._lock:
+            return {"loops": len(self._loops), "sessions_per_loop": list(self._active)}
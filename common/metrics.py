@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+# Latency buckets in seconds, sized around the PRD's 2.2s end-to-end target
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 2.2, 3.0, 5.0, 10.0)
+# Quantiles reported from a sliding window of recent observations
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape_label(value):
+    if isinstance(value, float):
+        return _format_value(value)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally labelled."""
+
+    type_name = "counter"
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name, description, callback):
+        self.name = name
+        self.description = description
+        self._callback = callback
+
+    def samples(self):
+        return [(self.name, (), self._callback())]
+
+
+class Histogram:
+    """
+    Prometheus histogram with fixed buckets, plus p50/p95/p99 over a sliding
+    window of the most recent observations for each label set.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name, description, buckets=LATENCY_BUCKETS, window=1024):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                    "recent": deque(maxlen=self.window),
+                }
+                self._series[key] = series
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+            series["recent"].append(value)
+
+    def quantiles(self, **labels):
+        """{quantile: value} over the recent window, or {} if nothing was observed."""
+        with self._lock:
+            series = self._series.get(tuple(sorted(labels.items())))
+            recent = sorted(series["recent"]) if series else []
+        if not recent:
+            return {}
+        return {
+            q: recent[min(int(q * len(recent)), len(recent) - 1)] for q in QUANTILES
+        }
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    out.append((f"{self.name}_bucket", key + (("le", bound),), cumulative))
+                out.append((f"{self.name}_bucket", key + (("le", float("inf")),), series["count"]))
+                out.append((f"{self.name}_sum", key, series["sum"]))
+                out.append((f"{self.name}_count", key, series["count"]))
+        return out
+
+    def quantile_samples(self):
+        with self._lock:
+            keys = list(self._series.keys())
+        out = []
+        for key in keys:
+            for q, value in self.quantiles(**dict(key)).items():
+                out.append((f"{self.name}_quantile", key + (("quantile", q),), value))
+        return out
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, description):
+        return self._register(Counter(name, description))
+
+    def gauge(self, name, description, callback):
+        return self._register(Gauge(name, description, callback))
+
+    def histogram(self, name, description, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                # A failing gauge callback must not break the whole scrape
+                continue
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            if isinstance(metric, Histogram):
+                quantile_samples = metric.quantile_samples()
+                if quantile_samples:
+                    lines.append(
+                        f"# HELP {metric.name}_quantile {metric.description} (p50/p95/p99 of recent observations)"
+                    )
+                    lines.append(f"# TYPE {metric.name}_quantile gauge")
+                    for name, labels, value in quantile_samples:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served at /metrics
+METRICS = MetricsRegistry()
+
+TURN_LATENCY = METRICS.histogram(
+    "voice_agent_turn_latency_seconds",
+    "Time from end of user speech to each stage of the agent's turn",
+)
+FUNCTION_LATENCY = METRICS.histogram(
+    "voice_agent_function_latency_seconds",
+    "Function call execution time",
+)
+BARGE_IN_LATENCY = METRICS.histogram(
+    "voice_agent_barge_in_latency_seconds",
+    "Time from UserStartedSpeaking to agent audio flushed",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class TurnTimings:
+    """
+    Timestamps for one conversational turn, from the user finishing speaking to
+    the agent's audio being done.
+
+    Each mark is recorded once (the first occurrence wins) unless it is set
+    with update(). finish() observes every stage relative to user_speech_end
+    into TURN_LATENCY and returns the stage durations.
+    """
+
+    STAGES = (
+        "first_transcript",
+        "function_calling",
+        "function_start",
+        "function_end",
+        "first_tts_byte",
+        "first_audio_played",
+        "agent_audio_done",
+    )
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.marks = {}
+
+    def mark(self, name, at=None):
+        if name not in self.marks:
+            self.marks[name] = at if at is not None else self._clock()
+
+    def update(self, name, at=None):
+        """Record name again, replacing an earlier mark (for stages that end last, not first)."""
+        self.marks[name] = at if at is not None else self._clock()
+
+    def finish(self):
+        start = self.marks.get("user_speech_end")
+        if start is None:
+            return {}
+        durations = {}
+        for stage in self.STAGES:
+            if stage in self.marks:
+                durations[stage] = max(self.marks[stage] - start, 0.0)
+                TURN_LATENCY.observe(durations[stage], stage=stage)
+        return durations
@@ -0,0 +1,205 @@
+"""
+Seeded bulk mock data generator for load testing.
+
+Records are generated column-wise with NumPy, so millions of customers,
+appointments and orders take seconds, and the output for a given seed and
+base date is always the same. Records are only turned into dicts chunk by
+chunk while streaming to JSON Lines or SQLite.
+
+Usage:
+    python -m common.mock_data_bulk --customers 1000000 --jsonl bulk_data/
+    python -m common.mock_data_bulk --customers 1000000 --sqlite business_data.db
+"""
+import argparse
+import json
+import pathlib
+import time
+from datetime import date, datetime
+import numpy as np
+from common.config import MOCK_DATA_SIZE
+from common.sqlite_store import SQLiteDataStore
+
+SERVICES = np.array(["Consultation", "Follow-up", "Review", "Planning"])
+APPOINTMENT_STATUSES = np.array(["Scheduled", "Completed", "Cancelled"])
+ORDER_STATUSES = np.array(["Pending", "Shipped", "Delivered", "Cancelled"])
+
+# Same spreads as generate_mock_data: joined/ordered up to a week ago, appointments
+# within the next week. Appointments fall on whole-hour business slots.
+DAY_SPREAD = 7
+BUSINESS_HOURS = (9, 17)
+CHUNK_SIZE = 50000
+SECONDS_PER_DAY = 86400
+
+
+def generate_columns(
+    customers, appointments=None, orders=None, seed=0, base_date=None, day_spread=DAY_SPREAD
+):
+    """
+    Generate mock data as NumPy columns.
+
+    appointments and orders default to the MOCK_DATA_SIZE ratios per customer.
+    base_date (a date, default today) anchors all dates, which spread over
+    day_spread days; together with the seed they fully determine the output.
+    """
+    if appointments is None:
+        appointments = customers * MOCK_DATA_SIZE["appointments"] // MOCK_DATA_SIZE["customers"]
+    if orders is None:
+        orders = customers * MOCK_DATA_SIZE["orders"] // MOCK_DATA_SIZE["customers"]
+    base = np.datetime64(base_date or date.today(), "s")
+    rng = np.random.default_rng(seed)
+
+    def past_dates(count):
+        offsets = rng.integers(0, (day_spread + 1) * SECONDS_PER_DAY, count)
+        return base - offsets.astype("timedelta64[s]")
+
+    appointment_days = rng.integers(0, day_spread + 1, appointments)
+    appointment_hours = rng.integers(BUSINESS_HOURS[0], BUSINESS_HOURS[1], appointments)
+    appointment_offsets = appointment_days * SECONDS_PER_DAY + appointment_hours * 3600
+
+    return {
+        "customers": {
+            "count": customers,
+            "joined_date": past_dates(customers),
+        },
+        "appointments": {
+            "count": appointments,
+            "customer": rng.integers(0, customers, appointments),
+            "date": base + appointment_offsets.astype("timedelta64[s]"),
+            "service": rng.integers(0, len(SERVICES), appointments),
+            "status": rng.integers(0, len(APPOINTMENT_STATUSES), appointments),
+        },
+        "orders": {
+            "count": orders,
+            "customer": rng.integers(0, customers, orders),
+            "date": past_dates(orders),
+            "items": rng.integers(1, 6, orders),
+            "total": np.round(rng.uniform(10.0, 500.0, orders), 2),
+            "status": rng.integers(0, len(ORDER_STATUSES), orders),
+        },
+    }
+
+
+def _customer_records(columns, start, stop):
+    joined = np.datetime_as_string(columns["joined_date"][start:stop])
+    for i, joined_date in zip(range(start, stop), joined.tolist()):
+        yield {
+            "id": f"CUST{i:04d}",
+            "name": f"Customer {i}",
+            "phone": f"+1555{i:07d}",
+            "email": f"customer{i}@example.com",
+            "joined_date": joined_date,
+        }
+
+
+def _appointment_records(columns, start, stop):
+    dates = np.datetime_as_string(columns["date"][start:stop]).tolist()
+    customers = columns["customer"][start:stop].tolist()
+    services = SERVICES[columns["service"][start:stop]].tolist()
+    statuses = APPOINTMENT_STATUSES[columns["status"][start:stop]].tolist()
+    for i, customer, apt_date, service, status in zip(
+        range(start, stop), customers, dates, services, statuses
+    ):
+        yield {
+            "id": f"APT{i:04d}",
+            "customer_id": f"CUST{customer:04d}",
+            "customer_name": f"Customer {customer}",
+            "date": apt_date,
+            "service": service,
+            "status": status,
+        }
+
+
+def _order_records(columns, start, stop):
+    dates = np.datetime_as_string(columns["date"][start:stop]).tolist()
+    customers = columns["customer"][start:stop].tolist()
+    items = columns["items"][start:stop].tolist()
+    totals = columns["total"][start:stop].tolist()
+    statuses = ORDER_STATUSES[columns["status"][start:stop]].tolist()
+    for i, customer, order_date, count, total, status in zip(
+        range(start, stop), customers, dates, items, totals, statuses
+    ):
+        yield {
+            "id": f"ORD{i:04d}",
+            "customer_id": f"CUST{customer:04d}",
+            "customer_name": f"Customer {customer}",
+            "date": order_date,
+            "items": count,
+            "total": total,
+            "status": status,
+        }
+
+
+RECORD_BUILDERS = {
+    "customers": _customer_records,
+    "appointments": _appointment_records,
+    "orders": _order_records,
+}
+
+
+def iter_records(data, table, chunk_size=CHUNK_SIZE):
+    """Yield one table's records as dicts (generate_mock_data's shape), chunk by chunk."""
+    columns = data[table]
+    build = RECORD_BUILDERS[table]
+    for start in range(0, columns["count"], chunk_size):
+        yield from build(columns, start, min(start + chunk_size, columns["count"]))
+
+
+def to_mock_data(data):
+    """Materialize every record, for the in-memory MockDataStore."""
+    return {table: list(iter_records(data, table)) for table in RECORD_BUILDERS}
+
+
+def write_jsonl(data, output_dir):
+    """Stream each table to <output_dir>/<table>.jsonl."""
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    encode = json.JSONEncoder().encode
+    for table in RECORD_BUILDERS:
+        with open(output_dir / f"{table}.jsonl", "w") as f:
+            f.writelines(encode(record) + "\n" for record in iter_records(data, table))
+
+
+def write_sqlite(data, path):
+    """Stream every table into a SQLite database through SQLiteDataStore's bulk loader."""
+    store = SQLiteDataStore(path)
+    try:
+        store.load({table: iter_records(data, table) for table in RECORD_BUILDERS})
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate bulk mock data for load testing")
+    parser.add_argument("--customers", type=int, default=MOCK_DATA_SIZE["customers"])
+    parser.add_argument("--appointments", type=int, default=None)
+    parser.add_argument("--orders", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--base-date",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+        default=None,
+        help="YYYY-MM-DD anchor for generated dates (default: today)",
+    )
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--jsonl", metavar="DIR", help="write <table>.jsonl files to DIR")
+    output.add_argument("--sqlite", metavar="PATH", help="load into a SQLite database at PATH")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = generate_columns(
+        args.customers, args.appointments, args.orders, args.seed, args.base_date
+    )
+    generated = time.perf_counter() - start
+    if args.jsonl:
+        write_jsonl(data, args.jsonl)
+    else:
+        write_sqlite(data, args.sqlite)
+    print(
+        f"{data['customers']['count']} customers, {data['appointments']['count']} appointments, "
+        f"{data['orders']['count']} orders: generated in {generated:.2f}s, "
+        f"written to {args.jsonl or args.sqlite} in {time.perf_counter() - start - generated:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
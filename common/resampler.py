@@ -0,0 +1,72 @@
+from math import gcd
+import numpy as np
+
+
+class StreamingResampler:
+    """
+    Streaming polyphase resampler for 16-bit mono PCM.
+
+    Converts in_rate to out_rate by the rational factor up/down using a
+    windowed-sinc low-pass FIR split into `up` phases. Filter history and the
+    output phase are carried between calls, so a stream can be fed in chunks
+    of any size (e.g. ScriptProcessor buffers) without clicks at chunk edges.
+    Keep one instance per session.
+    """
+
+    def __init__(self, in_rate, out_rate, taps=16):
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        g = gcd(self.in_rate, self.out_rate)
+        self.up = self.out_rate // g
+        self.down = self.in_rate // g
+        # Input samples per output sample; widened when decimating so the
+        # filter keeps the same transition band relative to the output rate
+        taps_per_phase = int(np.ceil(taps * max(1.0, self.down / self.up)))
+        self.taps_per_phase = taps_per_phase
+        self.passthrough = self.up == self.down
+
+        # Low-pass at the narrower of the two Nyquist bands, designed at the upsampled rate
+        num_taps = self.up * taps_per_phase
+        cutoff = 0.5 / max(self.up, self.down) * 0.95
+        n = np.arange(num_taps) - (num_taps - 1) / 2.0
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(num_taps, 8.0)
+        h *= self.up / h.sum()
+        # phases[p, k] = h[p + k * up]; reversed along k so a window of input
+        # samples (oldest -> newest) can be multiplied directly
+        self._phases = h.reshape(taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self._window_offsets = np.arange(-(taps_per_phase - 1), 1)
+
+        self.reset()
+
+    def reset(self):
+        """Clear filter state, e.g. after a gap in the stream."""
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        # Position of the next output sample on the upsampled time axis,
+        # relative to the start of history + new input
+        self._position = (self.taps_per_phase - 1) * self.up
+
+    def process(self, pcm_bytes):
+        """Resample a chunk of little-endian int16 PCM and return int16 PCM bytes."""
+        if self.passthrough:
+            return pcm_bytes
+
+        samples = np.frombuffer(pcm_bytes, dtype="<i2").astype(np.float32)
+        buffer = np.concatenate((self._history, samples))
+        end = len(buffer) * self.up
+
+        positions = np.arange(self._position, end, self.down)
+        if len(positions):
+            newest = positions // self.up
+            phase = positions % self.up
+            windows = buffer[newest[:, None] + self._window_offsets]
+            out = np.einsum("ij,ij->i", windows, self._phases[phase])
+            self._position = int(positions[-1]) + self.down
+        else:
+            out = np.empty(0, dtype=np.float32)
+
+        # Keep the last taps_per_phase - 1 samples and rebase the position
+        consumed = len(buffer) - (self.taps_per_phase - 1)
+        self._history = buffer[consumed:]
+        self._position -= consumed * self.up
+
+        return np.clip(np.rint(out), -32768, 32767).astype("<i2").tobytes()
@@ -1,19 +1,45 @@
+import asyncio
+import logging
 import os
-import wave
+import time
 from typing import Callable, Optional
+from common.agent_functions import resolve_audio_path
+from common.audio_assets import AUDIO_ASSETS
+from common.config import CHALISA_SEQUENCER
+
+logger = logging.getLogger(__name__)
+
+# Spoken before every verse; also pre-rendered to audio by common/tts_cache.py
+CHALISA_PREFACE = "Okay, let me play the verse for you first."
 
 
 class ChalisaSequencer:
     """
     Orchestrates: Preface (TTS) -> Verse playback (mp3/wav) -> Explanation+Repeat (TTS).
 
+    Stages overlap where they cannot be heard over each other: the verse audio
+    is loaded while the preface plays, the explanation is injected as soon as
+    the last verse chunk has been emitted (so its TTS is generated while the
+    browser plays the tail of the verse, and is scheduled after it), and the
+    next step's audio is prefetched while the current step plays. The verse
+    itself starts only after the browser has finished playing the preface.
+    Every stage has a timeout, and cancel() stops the lesson at once; the host
+    should call it on barge-in. Each step records a timing trace (seconds since
+    the step began).
+
     The sequencer is framework-agnostic. Provide callbacks for:
       - emit_conversation(role, content)
-      - inject_tts(message): awaitable that triggers agent TTS
-      - emit_mp3(bytes)
-      - emit_pcm_chunk(bytes, sample_rate)
-      - emit_pcm_done()
-      - await_playback_done(): awaitable that resolves when client confirms playback finished
+      - inject_tts(message): awaitable that triggers agent TTS (VoiceAgent.say plays
+        pre-rendered audio for fixed lines such as the preface)
+      - emit_mp3(data): consecutive whole MP3 frames of the verse, to be fed to one decoder
+      - emit_pcm_chunk(data, sample_rate)
+      - emit_pcm_done(): end of the streamed verse audio (PCM or MP3)
+      - await_playback_done(): awaitable that resolves when client confirms playback of
+        everything scheduled so far (agent speech included) finished
+      - on_trace(trace): optional, receives each step's timing trace
+
+    Audio data passed to emit_mp3/emit_pcm_chunk is a read-only memoryview
+    slice of the shared asset buffer.
     """
 
     def __init__(
@@ -24,6 +50,7 @@ class ChalisaSequencer:
         emit_pcm_chunk: Callable[[bytes, int], None],
         emit_pcm_done: Callable[[], None],
         await_playback_done,  # async function() -> None
+        on_trace: Optional[Callable[[dict], None]] = None,
     ) -> None:
         self.emit_conversation = emit_conversation
         self.inject_tts = inject_tts
@@ -31,6 +58,50 @@ class ChalisaSequencer:
         self.emit_pcm_chunk = emit_pcm_chunk
         self.emit_pcm_done = emit_pcm_done
         self.await_playback_done = await_playback_done
+        self.on_trace = on_trace
+        self.last_trace = None
+        self._advance = asyncio.Event()
+        self._task = None
+
+    def start(self, steps, index: int = 0) -> asyncio.Task:
+        """Run the lesson from steps[index] as a task; advance() moves to the next step."""
+        self.cancel()
+        self._task = asyncio.create_task(self.run_lesson(steps, index))
+        return self._task
+
+    def advance(self) -> None:
+        """The learner is ready for the next step."""
+        self._advance.set()
+
+    def cancel(self) -> None:
+        """Stop the running lesson (e.g. the user barged in)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def run_lesson(self, steps, index: int = 0) -> None:
+        """Play steps from index on, waiting for advance() (or advance_timeout) between steps."""
+        while index < len(steps):
+            step = steps[index]
+            self._advance.clear()
+            prefetch = None
+            if index + 1 < len(steps) and steps[index + 1].get("playback_audio_path"):
+                next_path = resolve_audio_path(steps[index + 1]["playback_audio_path"])
+                prefetch = asyncio.create_task(self._prefetch(next_path))
+            try:
+                path = step.get("playback_audio_path")
+                await self.run_step(
+                    resolve_audio_path(path) if path else None, step["translation_english"]
+                )
+                try:
+                    await asyncio.wait_for(
+                        self._advance.wait(), CHALISA_SEQUENCER["advance_timeout"]
+                    )
+                except asyncio.TimeoutError:
+                    return
+            finally:
+                if prefetch is not None and not prefetch.done():
+                    prefetch.cancel()
+            index += 1
 
     async def run_step(
         self,
@@ -38,42 +109,111 @@ class ChalisaSequencer:
         translation_en: str,
         verse_prompt: Optional[str] = None,
         repeat_prompt: Optional[str] = None,
-    ) -> None:
-        preface = "Okay, let me play the verse for you first."
-        self.emit_conversation("assistant", preface)
-        await self.inject_tts(preface)
+    ) -> dict:
+        started = time.monotonic()
+        trace = {}
 
-        if playback_path:
-            await self._play_audio(playback_path)
-            # Wait for browser playback confirmation
-            await self.await_playback_done()
+        def mark(stage):
+            trace.setdefault(stage, round(time.monotonic() - started, 3))
 
         meaning = f"Meaning in English: {translation_en}."
         repeat = repeat_prompt or "Now, would you like to repeat this line with me?"
-
         explanation = meaning if not verse_prompt else f"{verse_prompt} {meaning}"
         full_line = f"{explanation} {repeat}".strip()
+
+        explanation_task = None
+        # Validate (and transcode) the verse audio while the preface plays
+        load_task = asyncio.create_task(self._load(playback_path)) if playback_path else None
+        try:
+            self.emit_conversation("assistant", CHALISA_PREFACE)
+            await self._stage(
+                "preface", self.inject_tts(CHALISA_PREFACE), CHALISA_SEQUENCER["tts_timeout"]
+            )
+            mark("preface_injected")
+            # The verse shares the browser's playback schedule with agent speech,
+            # so it starts only once the preface has been heard
+            await self._stage(
+                "preface_playback", self.await_playback_done(), CHALISA_SEQUENCER["tts_timeout"]
+            )
+            mark("preface_done")
+
+            asset = await load_task if load_task is not None else None
+            if asset is not None:
+                mark("verse_start")
+                await self._play_audio(playback_path)
+                mark("verse_sent")
+                # Every verse chunk has been emitted and the browser holds the
+                # last lead_secs of it, so the explanation TTS is generated while
+                # that plays and is scheduled after it
+                explanation_task = asyncio.create_task(self._explain(full_line, mark))
+                # Wait for browser playback confirmation
+                await self._stage(
+                    "playback",
+                    self.await_playback_done(),
+                    asset.duration + CHALISA_SEQUENCER["playback_timeout_margin"],
+                )
+                mark("verse_done")
+                await explanation_task
+            else:
+                await self._explain(full_line, mark)
+            if "verse_done" in trace and "explanation_injected" in trace:
+                # Positive: the explanation was queued before the verse finished playing
+                trace["explanation_lead"] = round(
+                    trace["verse_done"] - trace["explanation_injected"], 3
+                )
+        except asyncio.CancelledError:
+            mark("cancelled")
+            raise
+        finally:
+            for task in (load_task, explanation_task):
+                if task is not None and not task.done():
+                    task.cancel()
+            mark("step_done")
+            self.last_trace = trace
+            if self.on_trace is not None:
+                self.on_trace(trace)
+        return trace
+
+    async def _explain(self, full_line: str, mark) -> None:
         self.emit_conversation("assistant", full_line)
-        await self.inject_tts(full_line)
+        await self._stage("explanation", self.inject_tts(full_line), CHALISA_SEQUENCER["tts_timeout"])
+        mark("explanation_injected")
 
-    async def _play_audio(self, path: str) -> None:
+    async def _stage(self, name: str, awaitable, timeout: float) -> bool:
+        """Await one stage, giving up after timeout seconds; False if it timed out."""
+        try:
+            await asyncio.wait_for(awaitable, timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Chalisa {name} stage timed out after {timeout:.1f}s")
+            return False
+
+    async def _load(self, path: str):
+        """Registered AudioAsset for path (validating/transcoding off the loop), or None."""
         ext = os.path.splitext(path)[1].lower()
-        if ext == ".mp3":
-            with open(path, "rb") as f:
-                self.emit_mp3(f.read())
-            return
-        if ext == ".wav":
-            with wave.open(path, "rb") as wf:
-                sr = int(wf.getframerate()) or 16000
-                frames_per_chunk = sr
-                while True:
-                    frames = wf.readframes(frames_per_chunk)
-                    if not frames:
-                        break
-                    self.emit_pcm_chunk(frames, sr)
-            self.emit_pcm_done()
-            return
-        # Unsupported - emit nothing
-        return
+        if ext not in (".mp3", ".wav"):
+            # Unsupported - no verse audio
+            return None
+        try:
+            return await asyncio.to_thread(AUDIO_ASSETS.playable, path)
+        except (ValueError, OSError) as e:
+            logger.warning(f"Cannot play verse audio {path}: {e}")
+            return None
 
+    async def _prefetch(self, path: str) -> None:
+        try:
+            await asyncio.to_thread(AUDIO_ASSETS.prefetch, path)
+        except (ValueError, OSError) as e:
+            logger.warning(f"Cannot prefetch verse audio {path}: {e}")
 
+    async def _play_audio(self, path: str) -> None:
+        """
+        Stream the verse in real-time paced chunks so playback starts immediately.
+        Audio comes from the shared asset cache, so repeat plays do not touch the disk.
+        """
+        async for chunk in AUDIO_ASSETS.stream(path):
+            if chunk.format == "mp3":
+                self.emit_mp3(chunk.data)
+            else:
+                self.emit_pcm_chunk(chunk.data, chunk.sample_rate)
+        self.emit_pcm_done()
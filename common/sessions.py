@@ -0,0 +1,72 @@
+import threading
+from common.config import SESSION_LIMITS
+
+
+class SessionRegistry:
+    """
+    Thread-safe registry of active voice agent sessions keyed by Socket.IO sid.
+
+    Each browser connection gets its own session object (VoiceAgent, Deepgram
+    websocket, Speaker, event loop task). The registry also enforces the
+    per-process session limit used for admission control.
+    """
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = (
+            max_sessions if max_sessions is not None else SESSION_LIMITS["max_sessions"]
+        )
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._total_started = 0
+        self._total_rejected = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, sid):
+        with self._lock:
+            return sid in self._sessions
+
+    def get(self, sid):
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def add(self, sid, session):
+        """Register a session. Returns False if the sid is taken or the limit is reached."""
+        with self._lock:
+            if sid in self._sessions or len(self._sessions) >= self.max_sessions:
+                self._total_rejected += 1
+                return False
+            self._sessions[sid] = session
+            self._total_started += 1
+            return True
+
+    def values(self):
+        """Snapshot of the active sessions."""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def remove(self, sid, session=None):
+        """
+        Remove and return the session for sid.
+
+        If session is given, only remove the entry when it is still that exact
+        object, so a finished session cannot evict a newer one for the same sid.
+        """
+        with self._lock:
+            current = self._sessions.get(sid)
+            if current is None or (session is not None and current is not session):
+                return None
+            return self._sessions.pop(sid)
+
+    def stats(self):
+        with self._lock:
+            active = len(self._sessions)
+            return {
+                "active": active,
+                "max": self.max_sessions,
+                "available": max(self.max_sessions - active, 0),
+                "total_started": self._total_started,
+                "total_rejected": self._total_rejected,
+            }
@@ -0,0 +1,281 @@
+import asyncio
+import functools
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from common.data_store import AppointmentIdAllocator, next_sequence, parse_date, slot_bounds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT,
+    email TEXT,
+    joined_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone);
+CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
+
+CREATE TABLE IF NOT EXISTS appointments (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    customer_name TEXT,
+    date TEXT,
+    date_key TEXT,  -- fixed-width normalized date for range queries
+    service TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_appointments_customer ON appointments(customer_id);
+CREATE INDEX IF NOT EXISTS idx_appointments_date_key ON appointments(date_key);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    customer_name TEXT,
+    date TEXT,
+    items INTEGER,
+    total REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id);
+"""
+
+CUSTOMER_COLUMNS = ("id", "name", "phone", "email", "joined_date")
+APPOINTMENT_COLUMNS = ("id", "customer_id", "customer_name", "date", "service", "status")
+ORDER_COLUMNS = ("id", "customer_id", "customer_name", "date", "items", "total", "status")
+
+# Statements are constant strings so sqlite3's per-connection statement cache reuses them
+SELECT_CUSTOMER_BY = {
+    "phone": "SELECT id, name, phone, email, joined_date FROM customers WHERE phone = ? LIMIT 1",
+    "email": "SELECT id, name, phone, email, joined_date FROM customers WHERE email = ? LIMIT 1",
+    "id": "SELECT id, name, phone, email, joined_date FROM customers WHERE id = ?",
+}
+SELECT_APPOINTMENTS_BY_CUSTOMER = (
+    "SELECT id, customer_id, customer_name, date, service, status "
+    "FROM appointments WHERE customer_id = ? ORDER BY rowid"
+)
+SELECT_APPOINTMENTS_BETWEEN = (
+    "SELECT id, customer_id, customer_name, date, service, status "
+    "FROM appointments WHERE date_key BETWEEN ? AND ? ORDER BY date_key"
+)
+SELECT_ORDERS_BY_CUSTOMER = (
+    "SELECT id, customer_id, customer_name, date, items, total, status "
+    "FROM orders WHERE customer_id = ? ORDER BY rowid"
+)
+INSERT_CUSTOMER = "INSERT INTO customers (id, name, phone, email, joined_date) VALUES (?, ?, ?, ?, ?)"
+INSERT_APPOINTMENT = (
+    "INSERT INTO appointments (id, customer_id, customer_name, date, date_key, service, status) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+# Conditional insert: the slot check and the write are one statement, so a concurrent
+# booking of the same hour (from any connection or process) makes this a no-op
+INSERT_APPOINTMENT_IF_SLOT_FREE = (
+    "INSERT INTO appointments (id, customer_id, customer_name, date, date_key, service, status) "
+    "SELECT ?, ?, ?, ?, ?, ?, ? WHERE NOT EXISTS "
+    "(SELECT 1 FROM appointments WHERE date_key >= ? AND date_key < ?)"
+)
+INSERT_ORDER = (
+    "INSERT INTO orders (id, customer_id, customer_name, date, items, total, status) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def date_key(value):
+    """Fixed-width sortable form of an ISO date string (None if unparseable)."""
+    parsed = parse_date(value) if isinstance(value, str) else value
+    return parsed.strftime("%Y-%m-%dT%H:%M:%S.%f") if parsed else None
+
+
+def _row_to_dict(columns, row):
+    return dict(zip(columns, row))
+
+
+class SQLiteConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared by a thread pool executor.
+
+    Queries run on the executor's threads so they never block the event loop;
+    each query borrows a connection for its duration.
+    """
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._connections = queue.Queue()
+        for _ in range(size):
+            self._connections.put(self._connect())
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sqlite")
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, cached_statements=256, timeout=30
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class SQLiteDataStore:
+    """
+    SQLite implementation of the MockDataStore interface.
+
+    Uses WAL mode, indexes matching every lookup, and a connection pool whose
+    queries run off the event loop via call(). add_appointment() is an
+    optimistic write: it only inserts if the hour slot is still free.
+    """
+
+    blocking = True
+
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        self.pool = SQLiteConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._ids = None
+        self._ids_lock = threading.Lock()
+
+    async def call(self, fn, *args, **kwargs):
+        """Run a store method on the pool's threads."""
+        return await self.pool.run(fn, *args, **kwargs)
+
+    def is_empty(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM customers LIMIT 1").fetchone() is None
+
+    def load(self, data, batch_size=50000):
+        """Bulk import mock data (as produced by generate_mock_data) in one transaction."""
+        with self.pool.connection() as conn:
+            with conn:
+                for statement, rows in (
+                    (
+                        INSERT_CUSTOMER,
+                        (tuple(c[k] for k in CUSTOMER_COLUMNS) for c in data["customers"]),
+                    ),
+                    (
+                        INSERT_APPOINTMENT,
+                        (
+                            (
+                                a["id"],
+                                a["customer_id"],
+                                a["customer_name"],
+                                a["date"],
+                                date_key(a["date"]),
+                                a["service"],
+                                a["status"],
+                            )
+                            for a in data["appointments"]
+                        ),
+                    ),
+                    (
+                        INSERT_ORDER,
+                        (tuple(o[k] for k in ORDER_COLUMNS) for o in data["orders"]),
+                    ),
+                ):
+                    batch = []
+                    for row in rows:
+                        batch.append(row)
+                        if len(batch) >= batch_size:
+                            conn.executemany(statement, batch)
+                            batch.clear()
+                    if batch:
+                        conn.executemany(statement, batch)
+            conn.execute("ANALYZE")
+
+    def get_customer(self, phone=None, email=None, customer_id=None):
+        if phone:
+            field, value = "phone", phone
+        elif email:
+            field, value = "email", email
+        elif customer_id:
+            field, value = "id", customer_id
+        else:
+            return None
+        with self.pool.connection() as conn:
+            row = conn.execute(SELECT_CUSTOMER_BY[field], (value,)).fetchone()
+        return _row_to_dict(CUSTOMER_COLUMNS, row) if row else None
+
+    def get_customer_appointments(self, customer_id):
+        with self.pool.connection() as conn:
+            rows = conn.execute(SELECT_APPOINTMENTS_BY_CUSTOMER, (customer_id,)).fetchall()
+        return [_row_to_dict(APPOINTMENT_COLUMNS, row) for row in rows]
+
+    def get_customer_orders(self, customer_id):
+        with self.pool.connection() as conn:
+            rows = conn.execute(SELECT_ORDERS_BY_CUSTOMER, (customer_id,)).fetchall()
+        return [_row_to_dict(ORDER_COLUMNS, row) for row in rows]
+
+    def appointments_between(self, start, end):
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                SELECT_APPOINTMENTS_BETWEEN, (date_key(start), date_key(end))
+            ).fetchall()
+        return [_row_to_dict(APPOINTMENT_COLUMNS, row) for row in rows]
+
+    def appointment_dates(self):
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT date FROM appointments")]
+
+    def allocate_appointment_id(self):
+        # Seeded from the highest existing ID on first use (after any bulk load)
+        with self._ids_lock:
+            if self._ids is None:
+                with self.pool.connection() as conn:
+                    ids = (row[0] for row in conn.execute("SELECT id FROM appointments"))
+                    self._ids = AppointmentIdAllocator(next_sequence(ids, "APT"))
+        return self._ids.allocate()
+
+    def add_appointment(self, appointment):
+        """
+        Insert an appointment unless another one already occupies its hour slot.
+        Returns the appointment, or None if the slot was taken.
+        """
+        values = (
+            appointment["id"],
+            appointment["customer_id"],
+            appointment["customer_name"],
+            appointment["date"],
+            date_key(appointment["date"]),
+            appointment["service"],
+            appointment["status"],
+        )
+        date = parse_date(appointment["date"])
+        with self.pool.connection() as conn:
+            with conn:
+                if date is None:
+                    conn.execute(INSERT_APPOINTMENT, values)
+                    return appointment
+                slot_start, slot_end = slot_bounds(date)
+                cursor = conn.execute(
+                    INSERT_APPOINTMENT_IF_SLOT_FREE,
+                    values + (date_key(slot_start), date_key(slot_end)),
+                )
+        return appointment if cursor.rowcount == 1 else None
+
+    def appointment_count(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0]
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,201 @@
+"""
+Pre-rendered speech for the agent's fixed utterances.
+
+Filler phrases, farewells, persona greetings and the Chalisa preface are the
+same text on every call, so instead of having the agent synthesize them each
+time they are rendered once, offline, to linear16 PCM at the agent audio rate
+and played straight through the session's Speaker. Audio is keyed by text,
+voice model and sample rate; utterances that are not in the cache fall back
+to InjectAgentMessage.
+
+Render from the repository root (Deepgram TTS, needs DEEPGRAM_API_KEY):
+    python -m common.tts_cache [--voice aura-2-thalia-en ...]
+or with the stub synthesizer, e.g. for local testing without TTS spend:
+    python -m common.tts_cache --stub
+Stub renders are only played when TTS_CACHE_SETTINGS["use_stub_audio"] is set.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import numpy as np
+import requests
+from common.agent_templates import AGENT_AUDIO_SAMPLE_RATE, VOICE, AgentTemplates
+from common.business_logic import FAREWELL_MESSAGES, FILLER_MESSAGES
+from common.config import TTS_CACHE_SETTINGS
+from common.metrics import METRICS
+from common.sequencer import CHALISA_PREFACE
+
+logger = logging.getLogger(__name__)
+
+DEEPGRAM_SPEAK_URL = "https://api.deepgram.com/v1/speak"
+INDEX_FILE = "index.json"
+
+TTS_CACHE_REQUESTS = METRICS.counter(
+    "voice_agent_tts_cache_requests_total",
+    "Fixed utterances played from pre-rendered audio (hit) or sent to the agent's TTS (miss)",
+)
+
+
+def fixed_utterances():
+    """Every constant string the agent speaks, greetings for all personas included."""
+    texts = list(FILLER_MESSAGES.values()) + list(FAREWELL_MESSAGES.values())
+    texts.append(CHALISA_PREFACE)
+    for persona in AgentTemplates.get_available_personas():
+        texts.append(AgentTemplates(persona).first_message)
+    return list(dict.fromkeys(texts))
+
+
+def stub_synthesizer(text, voice, sample_rate):
+    """Stand-in TTS: a quiet tone lasting about as long as the text takes to say."""
+    duration = max(len(text) * 0.06, 0.3)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    tone = 0.1 * np.sin(2 * math.pi * 220.0 * t)
+    return (tone * 32767).astype("<i2").tobytes()
+
+
+def deepgram_synthesizer(text, voice, sample_rate):
+    """Render text with Deepgram TTS as headerless linear16 PCM."""
+    api_key = os.environ.get("DEEPGRAM_API_KEY")
+    if api_key is None:
+        raise RuntimeError("DEEPGRAM_API_KEY env var not present")
+    response = requests.post(
+        DEEPGRAM_SPEAK_URL,
+        params={
+            "model": voice,
+            "encoding": "linear16",
+            "sample_rate": sample_rate,
+            "container": "none",
+        },
+        headers={"Authorization": f"Token {api_key}"},
+        json={"text": text},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.content
+
+
+class TTSCache:
+    """
+    On-disk store of rendered utterances: one raw PCM file per (text, voice,
+    sample rate) plus an index.json describing them. Files are read on first
+    use and then kept in memory; lookups are safe from any thread.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or TTS_CACHE_SETTINGS["directory"]
+        self._index = None
+        self._audio = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, voice, sample_rate):
+        return hashlib.sha256(f"{voice}\0{sample_rate}\0{text}".encode()).hexdigest()
+
+    def _load_index(self):
+        if self._index is None:
+            path = os.path.join(self.directory, INDEX_FILE)
+            try:
+                with open(path) as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                self._index = {}
+        return self._index
+
+    def get(self, text, voice, sample_rate=AGENT_AUDIO_SAMPLE_RATE):
+        """Rendered PCM for text in voice, or None if it has not been rendered."""
+        if not TTS_CACHE_SETTINGS["enabled"]:
+            return None
+        audio = self._read(text, voice, sample_rate)
+        TTS_CACHE_REQUESTS.inc(outcome="hit" if audio is not None else "miss")
+        return audio
+
+    def contains(self, text, voice, sample_rate=AGENT_AUDIO_SAMPLE_RATE):
+        """Whether get() would return audio, without counting a request."""
+        return TTS_CACHE_SETTINGS["enabled"] and self._read(text, voice, sample_rate) is not None
+
+    def _read(self, text, voice, sample_rate):
+        key = self.key(text, voice, sample_rate)
+        with self._lock:
+            audio = self._audio.get(key)
+            if audio is not None:
+                return audio
+            entry = self._load_index().get(key)
+        if entry is None or (
+            entry["synthesizer"] == "stub" and not TTS_CACHE_SETTINGS["use_stub_audio"]
+        ):
+            return None
+        try:
+            with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                audio = f.read()
+        except OSError as e:
+            logger.warning(f"Cannot read pre-rendered audio for {text!r}: {e}")
+            return None
+        with self._lock:
+            self._audio[key] = audio
+        return audio
+
+    def put(self, text, voice, sample_rate, audio, synthesizer):
+        key = self.key(text, voice, sample_rate)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{key}.pcm"), "wb") as f:
+            f.write(audio)
+        with self._lock:
+            self._load_index()[key] = {
+                "text": text,
+                "voice": voice,
+                "sample_rate": sample_rate,
+                "synthesizer": synthesizer,
+                "file": f"{key}.pcm",
+            }
+            self._audio.pop(key, None)
+            index = dict(self._index)
+        with open(os.path.join(self.directory, INDEX_FILE), "w") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+
+    def render(
+        self,
+        texts,
+        voice,
+        synthesize,
+        synthesizer_name,
+        sample_rate=AGENT_AUDIO_SAMPLE_RATE,
+        force=False,
+    ):
+        """Render each text not already rendered by this synthesizer (all with force); returns the count."""
+        rendered = 0
+        for text in texts:
+            entry = self._load_index().get(self.key(text, voice, sample_rate), {})
+            if not force and entry.get("synthesizer") == synthesizer_name:
+                continue
+            audio = synthesize(text, voice, sample_rate)
+            self.put(text, voice, sample_rate, audio, synthesizer_name)
+            rendered += 1
+        return rendered
+
+
+# Process-wide cache of pre-rendered utterances
+TTS_CACHE = TTSCache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--voice", action="append", help=f"voice model (default {VOICE}); repeatable")
+    parser.add_argument("--stub", action="store_true", help="use the stub synthesizer")
+    parser.add_argument("--force", action="store_true", help="re-render utterances already cached")
+    args = parser.parse_args()
+
+    synthesize, name = (stub_synthesizer, "stub") if args.stub else (deepgram_synthesizer, "deepgram")
+    texts = fixed_utterances()
+    for voice in args.voice or [VOICE]:
+        rendered = TTS_CACHE.render(texts, voice, synthesize, name, force=args.force)
+        print(f"{voice}: rendered {rendered} of {len(texts)} utterances with the {name} synthesizer")
+    print(f"Cache: {os.path.abspath(TTS_CACHE.directory)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())